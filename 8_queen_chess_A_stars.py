@@ -1,65 +1,12 @@
+import heapq
 import tkinter as tk
 import random
 import csv
+from itertools import count
 from tkinter import filedialog
-
-def is_safe(state, row, col):
-    for r, c in enumerate(state):
-        if c == col or abs(c - col) == abs(r - row):
-            return False
-    return True
-
-def solve_n_queens_all(n=8):
-    sols = []
-    def backtrack(state):
-        row = len(state)
-        if row == n:
-            sols.append(tuple(state))
-            return
-        for col in range(n):
-            if is_safe(state, row, col):
-                state.append(col)
-                backtrack(state)
-                state.pop()
-    backtrack([])
-    return sols
-
-class BoardCanvas:
-    def __init__(self, parent, n=8, cell_size=40):
-        self.n = n
-        self.cell = cell_size
-        self.canvas = tk.Canvas(parent, width=n*cell_size, height=n*cell_size)
-        self.canvas.pack()
-        self.queen_items = []
-        self._draw_grid()
-
-    def _draw_grid(self):
-        self.canvas.delete("cell")
-        for r in range(self.n):
-            for c in range(self.n):
-                x1, y1 = c*self.cell, r*self.cell
-                x2, y2 = x1+self.cell, y1+self.cell
-                color = "white" if (r+c)%2==0 else "gray"
-                self.canvas.create_rectangle(x1,y1,x2,y2, fill=color, tags="cell")
-
-    def clear_queens(self):
-        for item in self.queen_items:
-            self.canvas.delete(item)
-        self.queen_items = []
-
-    def show_partial(self, state, color="red"):
-        self.clear_queens()
-        for r, c in enumerate(state):
-            cx = c*self.cell + self.cell/2
-            cy = r*self.cell + self.cell/2
-            tid = self.canvas.create_text(cx, cy, text="Q", font=("Arial", 16, "bold"), fill=color)
-            self.queen_items.append(tid)
-
-    def flash_scene(self, color):
-        overlay = self.canvas.create_rectangle(
-            0, 0, self.n*self.cell, self.n*self.cell,
-            fill=color, outline="")
-        self.canvas.after(500, lambda: self.canvas.delete(overlay))
+from queen_chess_core import EMPTY_MASKS, encode_state, expand, push_col
+from queen_chess_solutions import load_solutions
+from queen_chess_ui import BoardCanvas, RunController
 
 def calc_attack_cost(row, col, path):
     if not path:
@@ -68,39 +15,90 @@ def calc_attack_cost(row, col, path):
         r_last, c_last = path[-1][0], path[-1][1]
     return abs(row - r_last) + abs(col - c_last)
 
-def func_f(cells, c):
-    def safe_key(item):
-        try:
-            return item[3]
-        except Exception:
-            return float('inf')
-    c.sort(reverse=True, key=safe_key)
-    return cells + c
-
-def astar_steps(goal, n=8):
-    cells = [(0, [], [], 0, 0)]
+def by_f(item):
+    return item[3]
+
+def astar_steps(goal, n=8, best_first=False, detect_duplicates=False):
+    """A* theo thứ tự mở rộng cũ: ngăn xếp, con của mỗi node được sắp theo f giảm
+    dần rồi nối vào cuối nên con có f nhỏ nhất được lấy ra trước.
+
+    Nối bằng list.extend thay vì tạo list mới nên mỗi lần mở rộng chỉ tốn theo số
+    con. best_first=True chuyển sang best_first_steps (heap theo f toàn cục), đúng
+    kiểu A* hơn nhưng với hàm chi phí này phải mở rộng nhiều node hơn hẳn.
+    """
+    if best_first:
+        yield from best_first_steps(goal, n, detect_duplicates)
+        return
+
+    cells = [(0, [], [], 0, 0, EMPTY_MASKS)]
     while cells:
-        row, state, path, f_cost, g_cost = cells.pop()
+        row, state, path, f_cost, g_cost, masks = cells.pop()
 
         if row == n:
-            if tuple(state) == goal:
+            if tuple(state) == tuple(goal):
                 yield state, True, path
                 return
             continue
 
-        c = []
-        for col in range(n):
-            if is_safe(state, row, col):
-                new_state = state + [col]
-                step_cost = calc_attack_cost(row, col, path)
-                new_g = g_cost + step_cost
-                h = abs(goal[row] - col)
-                new_f = new_g + h
-                new_path = path + [(row, col, new_g, h, new_f)]
-                yield new_state, False, new_path
-                c.append((row + 1, new_state, new_path, new_f, new_g))
+        children = []
+        for col, child_masks in expand(masks, n):
+            new_state = state + [col]
+            step_cost = calc_attack_cost(row, col, path)
+            new_g = g_cost + step_cost
+            h = abs(goal[row] - col)
+            new_f = new_g + h
+            new_path = path + [(row, col, new_g, h, new_f)]
+            yield new_state, False, new_path
+            children.append((row + 1, new_state, new_path, new_f, new_g, child_masks))
+
+        children.sort(reverse=True, key=by_f)
+        cells.extend(children)
+
+def best_first_steps(goal, n=8, detect_duplicates=False):
+    """A* trên heap nhị phân với khoá (f, h, thứ tự chèn).
+
+    Trạng thái đã mở rộng được đánh dấu bằng mã state trong tập closed. Khi
+    detect_duplicates bật, mỗi state chỉ giữ g nhỏ nhất đã thấy: đường đi tốt
+    hơn được đẩy thêm vào heap và bản cũ bị bỏ qua khi lấy ra (xoá lười).
+    """
+    goal_code = encode_state(goal, n)
+    counter = count()
+    heap = [(0, 0, next(counter), 0, 0, [], [], EMPTY_MASKS)]
+    closed = set()
+    best_g = {}
+
+    while heap:
+        _, _, _, g_cost, code, state, path, masks = heapq.heappop(heap)
+        if code in closed:
+            continue
+        if detect_duplicates and g_cost > best_g.get(code, g_cost):
+            continue
+        closed.add(code)
+
+        row = len(state)
+        if row == n:
+            if code == goal_code:
+                yield state, True, path
+                return
+            continue
 
-        cells = func_f(cells, c)
+        for col, child_masks in expand(masks, n):
+            new_state = state + [col]
+            step_cost = calc_attack_cost(row, col, path)
+            new_g = g_cost + step_cost
+            h = abs(goal[row] - col)
+            new_f = new_g + h
+            new_path = path + [(row, col, new_g, h, new_f)]
+            yield new_state, False, new_path
+
+            new_code = push_col(code, row, col, n)
+            if new_code in closed:
+                continue
+            if detect_duplicates:
+                if new_g >= best_g.get(new_code, new_g + 1):
+                    continue
+                best_g[new_code] = new_g
+            heapq.heappush(heap, (new_f, h, next(counter), new_g, new_code, new_state, new_path, child_masks))
 
 def main():
     root = tk.Tk()
@@ -110,12 +108,14 @@ def main():
     frame.pack()
     board_left = BoardCanvas(frame, n=8, cell_size=40)
     board_right = BoardCanvas(frame, n=8, cell_size=40)
+    controller = RunController(root, board_left, delay=10)
 
-    all_sols = solve_n_queens_all(8)
+    all_sols = load_solutions(8)
     goal_holder = {"sol": None, "gen": None}
     last_path_holder = {"path": []}
 
     def random_goal():
+        controller.stop()
         sol = random.choice(all_sols)
         goal_holder["sol"] = sol
         board_right.show_partial(sol, color="blue")
@@ -127,23 +127,14 @@ def main():
         if not sol: 
             return
         goal_holder["gen"] = astar_steps(sol, 8)
-        step()
+        controller.start(goal_holder["gen"], on_finish=finish)
 
-    def step():
-        gen = goal_holder.get("gen")
-        if not gen:
-            return
-        try:
-            state, done, path = next(gen)
-            board_left.show_partial(state, color="red")
-            if done:
-                last_path_holder["path"] = path
-                board_left.flash_scene("lightgreen")
-                return
-            root.after(10, step)
-        except StopIteration:
+    def finish(item, exhausted):
+        if exhausted:
             board_left.flash_scene("red")
             return
+        last_path_holder["path"] = item[2]
+        board_left.flash_scene("lightgreen")
 
     def export_csv():
         if not last_path_holder["path"]:
@@ -168,6 +159,7 @@ def main():
     tk.Button(btn_frame, text="Random Goal", command=random_goal).pack(side="left", padx=10, pady=10)
     tk.Button(btn_frame, text="Run", command=run).pack(side="left", padx=10, pady=10)
     tk.Button(btn_frame, text="Export CSV", command=export_csv).pack(side="left", padx=10, pady=10)
+    controller.controls(btn_frame)
 
     root.mainloop()
 
@@ -1,102 +1,122 @@
 import tkinter as tk
 import random
-import csv
-
-def is_safe(state, row, col):
-    for r, c in enumerate(state):
-        if c == col or abs(c - col) == abs(r - row):
-            return False
-    return True
-
-def solve_n_queens_all(n=8):
-    sols = []
-    def backtrack(state):
-        row = len(state)
-        if row == n:
-            sols.append(tuple(state))
-            return
-        for col in range(n):
-            if is_safe(state, row, col):
-                state.append(col)
-                backtrack(state)
-                state.pop()
-    backtrack([])
-    return sols
-
-class BoardCanvas:
-    def __init__(self, parent, n=8, cell_size=40):
-        self.n = n
-        self.cell = cell_size
-        self.canvas = tk.Canvas(parent, width=n*cell_size, height=n*cell_size)
-        self.canvas.pack()
-        self.queen_items = []
-        self._draw_grid()
-
-    def _draw_grid(self):
-        self.canvas.delete("cell")
-        for r in range(self.n):
-            for c in range(self.n):
-                x1, y1 = c*self.cell, r*self.cell
-                x2, y2 = x1+self.cell, y1+self.cell
-                color = "white" if (r+c)%2==0 else "gray"
-                self.canvas.create_rectangle(x1,y1,x2,y2, fill=color, tags="cell")
-
-    def clear_queens(self):
-        for item in self.queen_items:
-            self.canvas.delete(item)
-        self.queen_items = []
-
-    def show_partial(self, state, color="red"):
-        self.clear_queens()
-        for r, c in enumerate(state):
-            cx = c*self.cell + self.cell/2
-            cy = r*self.cell + self.cell/2
-            tid = self.canvas.create_text(cx, cy, text="Q", font=("Arial", 16, "bold"), fill=color)
-            self.queen_items.append(tid)
-
-    def flash_scene(self, color):
-        overlay = self.canvas.create_rectangle(
-            0, 0, self.n*self.cell, self.n*self.cell,
-            fill=color, outline="")
-        self.canvas.after(500, lambda: self.canvas.delete(overlay))
-
-def and_or_search(goal, n=8):
-    def backtrack(state):
+from queen_chess_core import EMPTY_MASKS, expand
+from queen_chess_log import TraceLog
+from queen_chess_solutions import load_solutions
+from queen_chess_ui import BoardCanvas, RunController
+
+NODE_TYPES = ("EXPAND", "SUCCESS", "FAIL", "AND", "AND_FAIL", "OR", "BACKTRACK", "CACHED")
+NODE_CODES = {name: code for code, name in enumerate(NODE_TYPES)}
+LOG_COLUMNS = [
+    ("Hàng", lambda r: r.row + 1),
+    ("State", lambda r: list(r.state)),
+    ("Loại node", lambda r: NODE_TYPES[r.code]),
+    ("Hoàn thành", lambda r: "✔" if r.arg else ""),
+]
+
+def subproblem_key(masks, on_goal_path, n):
+    """Mã số của bài toán con: ba mặt nạ (hàng suy ra từ số cột đã đặt) và cờ còn trùng tiền tố goal.
+
+    Hai node có cùng mã có cây con giống hệt nhau nên dùng chung nhãn SOLVED/FAILED.
+    """
+    cols, left, right = masks
+    return (((cols << n | left) << n | right) << 1) | on_goal_path
+
+def solution_subtree(state, n):
+    """Cây lời giải gọn: (loại node, hàng, các cột được chọn) theo thứ tự từ gốc"""
+    return tuple(("OR" if row < n - 1 else "AND", row, (col,)) for row, col in enumerate(state))
+
+def _finish_stats(stats, failed):
+    stats["cache_size"] = len(failed)
+    stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+
+def and_or_search(goal, n=8, memo=False, stats=None):
+    """AND-OR search bằng ngăn xếp tường minh các iterator cột của node OR.
+
+    Node ở hàng n - 1 là node AND, các con của nó là lá nên được xét ngay tại chỗ.
+    Node AND dừng ở lá thất bại đầu tiên, node OR dừng ở con thành công đầu tiên.
+    memo=True (tuỳ chọn, mặc định tắt) lưu nhãn FAILED theo subproblem_key và bỏ
+    qua node con có nhãn trong bảng (yield "CACHED"); ba mặt nạ rất hiếm khi lặp
+    lại (tỉ lệ trúng chỉ vài %) nên tra bảng thường chậm hơn là nhanh hơn. stats
+    (dict) nhận số lần tra bảng, số lần trúng, tỉ lệ trúng, số nhãn đã lưu và cây
+    lời giải (khoá "solution") khi tìm thấy goal; thành công ở một lá kết thúc
+    luôn cả lượt tìm kiếm.
+    state yield ra là list dùng chung, thay đổi theo các bước sau; ai cần giữ lại
+    thì tự sao chép.
+    """
+    if stats is None:
+        stats = {}
+    stats.update(lookups=0, hits=0, hit_rate=0.0, cache_size=0, solution=None)
+    failed = set()
+    state = []
+    stack = []
+    keys = []
+    masks = EMPTY_MASKS
+    matched = 0
+    while True:
         row = len(state)
         yield state, "EXPAND", False, row
+        key = subproblem_key(masks, matched == row, n)
 
         if row == n:
-            if tuple(state) == goal:
-                yield state, "SUCCESS", True, row
-            else:
-                yield state, "FAIL", False, row
-            return
-
-        if row == n - 1:
+            done = matched == n
+            if done:
+                stats["solution"] = solution_subtree(state, n)
+                _finish_stats(stats, failed)
+            yield state, ("SUCCESS" if done else "FAIL"), done, row
+            if done:
+                return
+        elif row == n - 1:
             all_success = True
-            for col in range(n):
-                if is_safe(state, row, col):
-                    new_state = state + [col]
-                    yield new_state, "AND", False, row
-                    found = False
-                    for s, _, done, _ in backtrack(new_state):
-                        yield s, "AND", done, row
-                        if done:
-                            found = True
-                    if not found:
-                        all_success = False
+            for col, _ in expand(masks, n):
+                state.append(col)
+                done = matched == row and goal[row] == col
+                if done:
+                    stats["solution"] = solution_subtree(state, n)
+                    _finish_stats(stats, failed)
+                yield state, "AND", done, row
+                if done:
+                    return
+                state.pop()
+                all_success = False
+                break
             if not all_success:
+                if memo:
+                    failed.add(key)
                 yield state, "AND_FAIL", False, row
-            return
-
-        for col in range(n):
-            if is_safe(state, row, col):
-                new_state = state + [col]
-                yield new_state, "OR", False, row
-                yield from backtrack(new_state)
-        yield state, "BACKTRACK", False, row
+        else:
+            stack.append(expand(masks, n))
+            keys.append(key)
 
-    yield from backtrack([])
+        # Quay lui tới node OR gần nhất còn cột chưa thử (bỏ qua các con đã biết FAILED)
+        while stack:
+            if len(state) == len(stack):
+                state.pop()
+                matched = min(matched, len(state))
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                key = keys.pop()
+                if memo:
+                    failed.add(key)
+                yield state, "BACKTRACK", False, len(state)
+                continue
+            col, masks = child
+            row = len(state)
+            state.append(col)
+            if matched == row and goal[row] == col:
+                matched += 1
+            yield state, "OR", False, row
+            if not memo:
+                break
+            stats["lookups"] += 1
+            if subproblem_key(masks, matched == row + 1, n) not in failed:
+                break
+            stats["hits"] += 1
+            yield state, "CACHED", False, row
+        else:
+            _finish_stats(stats, failed)
+            return
 
 def main():
     root = tk.Tk()
@@ -106,14 +126,16 @@ def main():
     frame.pack()
     board_left = BoardCanvas(frame, n=8, cell_size=40)
     board_right = BoardCanvas(frame, n=8, cell_size=40)
+    controller = RunController(root, board_left, delay=50)
 
-    all_sols = solve_n_queens_all(8)
-    goal_holder = {"sol": None, "gen": None, "log": []}
+    all_sols = load_solutions(8)
+    goal_holder = {"sol": None, "gen": None, "log": TraceLog(8, LOG_COLUMNS)}
 
     def random_goal():
+        controller.stop()
         sol = random.choice(all_sols)
         goal_holder["sol"] = sol
-        goal_holder["log"] = []
+        goal_holder["log"].clear()
         board_right.show_partial(sol, color="blue")
         board_left.clear_queens()
 
@@ -121,42 +143,25 @@ def main():
         sol = goal_holder.get("sol")
         if not sol:
             return
+        controller.stop()
         goal_holder["gen"] = and_or_search(sol, 8)
-        goal_holder["log"] = []
-        step()
+        goal_holder["log"].clear()
+        controller.start(goal_holder["gen"], on_step=record_step, on_finish=finish)
 
-    def step():
-        gen = goal_holder.get("gen")
-        if not gen:
-            return
-        try:
-            state, node_type, done, row = next(gen)
-            board_left.show_partial(state, color="red")
-
-            # Ghi log
-            goal_holder["log"].append({
-                "Hàng": row + 1,
-                "State": str(state),
-                "Loại node": node_type,
-                "Hoàn thành": "✔" if done else ""
-            })
+    def record_step(item):
+        state, node_type, done, row = item
+        # Ghi log
+        goal_holder["log"].record(0, row, state, NODE_CODES[node_type], arg=done)
+        return done
 
-            if done:
-                board_left.flash_scene("lightgreen")
-                return
-            root.after(50, step)
-        except StopIteration:
-            board_left.flash_scene("red")
-            return
+    def finish(item, exhausted):
+        board_left.flash_scene("red" if exhausted else "lightgreen")
 
     def export_csv():
-        logs = goal_holder.get("log", [])
-        if not logs:
+        log = goal_holder["log"]
+        if not log:
             return
-        with open("and_or_result.csv", "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=["Hàng", "State", "Loại node", "Hoàn thành"])
-            writer.writeheader()
-            writer.writerows(logs)
+        log.export_csv("and_or_result.csv")
         board_left.flash_scene("yellow")
 
     btn_frame = tk.Frame(root)
@@ -165,6 +170,7 @@ def main():
     tk.Button(btn_frame, text="Random Goal", command=random_goal).pack(side="left", padx=10)
     tk.Button(btn_frame, text="Run", command=run).pack(side="left", padx=10)
     tk.Button(btn_frame, text="Xuất CSV", command=export_csv).pack(side="left", padx=10)
+    controller.controls(btn_frame)
 
     root.mainloop()
 
@@ -1,84 +1,65 @@
 import tkinter as tk
 import random
-
-def is_safe(state, row, col):
-    for r, c in enumerate(state):
-        if c == col or abs(c - col) == abs(r - row):
-            return False
-    return True
-
-def solve_n_queens_all(n=8):
-    sols = []
-    def backtrack(state):
-        row = len(state)
-        if row == n:
-            sols.append(tuple(state))
+from queen_chess_core import EMPTY_MASKS, expand
+from queen_chess_solutions import load_solutions
+from queen_chess_ui import BoardCanvas, RunController
+
+PUSH, POP, GOAL = range(3)
+
+def backtracking_events(goal, n=8):
+    """Backtracking bằng ngăn xếp tường minh các iterator cột.
+
+    Sinh các sự kiện nhẹ (loại, row, col): PUSH khi đặt hậu, POP khi gỡ hậu và
+    GOAL khi tới goal. Mỗi sự kiện tốn O(1) bất kể độ sâu; việc so với goal được
+    theo dõi dần bằng độ dài tiền tố trùng với goal.
+    """
+    cols = []
+    stack = [expand(EMPTY_MASKS, n)]
+    matched = 0
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            if cols:
+                row = len(cols) - 1
+                matched = min(matched, row)
+                yield POP, row, cols.pop()
+            continue
+        col, child_masks = child
+        row = len(cols)
+        cols.append(col)
+        if matched == row and goal[row] == col:
+            matched += 1
+        yield PUSH, row, col
+        if row + 1 < n:
+            stack.append(expand(child_masks, n))
+            continue
+        if matched == n:
+            yield GOAL, row, col
             return
-        for col in range(n):
-            if is_safe(state, row, col):
-                state.append(col)
-                backtrack(state)
-                state.pop()
-    backtrack([])
-    return sols
-
-class BoardCanvas:
-    def __init__(self, parent, n=8, cell_size=40):
-        self.n = n
-        self.cell = cell_size
-        self.canvas = tk.Canvas(parent, width=n*cell_size, height=n*cell_size)
-        self.canvas.pack()
-        self.queen_items = []
-        self._draw_grid()
-
-    def _draw_grid(self):
-        self.canvas.delete("cell")
-        for r in range(self.n):
-            for c in range(self.n):
-                x1, y1 = c*self.cell, r*self.cell
-                x2, y2 = x1+self.cell, y1+self.cell
-                color = "white" if (r+c)%2==0 else "gray"
-                self.canvas.create_rectangle(x1,y1,x2,y2, fill=color, tags="cell")
-
-    def clear_queens(self):
-        for item in self.queen_items:
-            self.canvas.delete(item)
-        self.queen_items = []
-
-    def show_partial(self, state, color="red"):
-        self.clear_queens()
-        for r, c in enumerate(state):
-            cx = c*self.cell + self.cell/2
-            cy = r*self.cell + self.cell/2
-            tid = self.canvas.create_text(cx, cy, text="Q", font=("Arial", 16, "bold"), fill=color)
-            self.queen_items.append(tid)
-
-    def flash_scene(self, color):
-        overlay = self.canvas.create_rectangle(
-            0, 0, self.n*self.cell, self.n*self.cell,
-            fill=color, outline="")
-        self.canvas.after(500, lambda: self.canvas.delete(overlay))
+        cols.pop()
+        matched = min(matched, row)
+        yield POP, row, col
 
 def backtracking_steps(goal, n=8):
-    path = []
-    state = []
+    """Giao thức (state, done, path) dựng trên backtracking_events.
 
-    def backtrack(row):
-        if row == n:
-            if tuple(state) == goal:
-                yield list(state), True, list(path)
-                return
+    state và path yield ra là list dùng chung, thay đổi theo các bước sau; chỉ
+    bước goal mới trả về bản sao. Ai cần giữ lại một bước thì tự sao chép.
+    """
+    state = []
+    path = []
+    for event, row, col in backtracking_events(goal, n):
+        if event == PUSH:
+            state.append(col)
+            path.append((row, col))
+            yield state, False, path
+        elif event == POP:
+            state.pop()
+            path.pop()
+        else:
+            yield list(state), True, list(path)
             return
-        for col in range(n):
-            if is_safe(state, row, col):
-                state.append(col)
-                path.append((row, col))
-                yield list(state), False, list(path)
-                yield from backtrack(row + 1)
-                state.pop()
-                path.pop()
-
-    yield from backtrack(0)
 
 def main():
     root = tk.Tk()
@@ -88,11 +69,13 @@ def main():
     frame.pack()
     board_left = BoardCanvas(frame, n=8, cell_size=40)
     board_right = BoardCanvas(frame, n=8, cell_size=40)
+    controller = RunController(root, board_left, delay=30)
 
-    all_sols = solve_n_queens_all(8)
+    all_sols = load_solutions(8)
     goal_holder = {"sol": None, "gen": None, "path": None}
 
     def random_goal():
+        controller.stop()
         sol = random.choice(all_sols)
         goal_holder["sol"] = sol
         board_right.show_partial(sol, color="blue")
@@ -104,22 +87,12 @@ def main():
         if not sol:
             return
         goal_holder["gen"] = backtracking_steps(sol, 8)
-        step()
+        controller.start(goal_holder["gen"], on_finish=finish)
 
-    def step():
-        gen = goal_holder.get("gen")
-        if not gen:
-            return
-        try:
-            state, done, path = next(gen)
-            board_left.show_partial(state, color="red")
-            if done:
-                goal_holder["path"] = path
-                board_left.flash_scene("lightgreen")
-                return
-            root.after(30, step)
-        except StopIteration:
-            return
+    def finish(item, exhausted):
+        if not exhausted:
+            goal_holder["path"] = item[2]
+            board_left.flash_scene("lightgreen")
 
     def export_file():
         path = goal_holder.get("path")
@@ -139,6 +112,7 @@ def main():
     tk.Button(btn_frame, text="Random Goal", command=random_goal).pack(side="left", padx=10, pady=10)
     tk.Button(btn_frame, text="Run", command=run).pack(side="left", padx=10, pady=10)
     tk.Button(btn_frame, text="Xuất File", command=export_file).pack(side="left", padx=10, pady=10)
+    controller.controls(btn_frame)
 
     root.mainloop()
 
@@ -1,108 +1,53 @@
 import tkinter as tk
+import heapq
 import random
+from operator import itemgetter
+from queen_chess_core import safe_pairs
+from queen_chess_solutions import load_solutions
+from queen_chess_ui import BoardCanvas, RunController
 
-def is_safe(state, row, col):
-    for r, c in enumerate(state):
-        if c == col or abs(c - col) == abs(r - row):
-            return False
-    return True
+def queen_conflicts(state, col):
+    """Số hậu trong state ăn một hậu mới đặt ở hàng len(state), cột col, trong O(k)"""
+    row = len(state)
+    return sum(1 for i, c in enumerate(state) if c == col or abs(c - col) == row - i)
 
-def solve_n_queens_all(n=8):
-    sols = []
-    def backtrack(state):
-        row = len(state)
-        if row == n:
-            sols.append(tuple(state))
-            return
-        for col in range(n):
-            if is_safe(state, row, col):
-                state.append(col)
-                backtrack(state)
-                state.pop()
-    backtrack([])
-    return sols
-
-class BoardCanvas:
-    def __init__(self, parent, n=8, cell_size=40):
-        self.n = n
-        self.cell = cell_size
-        self.canvas = tk.Canvas(parent, width=n*cell_size, height=n*cell_size)
-        self.canvas.pack()
-        self.queen_items = []
-        self._draw_grid()
-
-    def _draw_grid(self):
-        self.canvas.delete("cell")
-        for r in range(self.n):
-            for c in range(self.n):
-                x1, y1 = c*self.cell, r*self.cell
-                x2, y2 = x1+self.cell, y1+self.cell
-                color = "white" if (r+c)%2==0 else "gray"
-                self.canvas.create_rectangle(x1,y1,x2,y2, fill=color, tags="cell")
-
-    def clear_queens(self):
-        for item in self.queen_items:
-            self.canvas.delete(item)
-        self.queen_items = []
-
-    def show_partial(self, state, color="red"):
-        self.clear_queens()
-        for r, c in enumerate(state):
-            cx = c*self.cell + self.cell/2
-            cy = r*self.cell + self.cell/2
-            tid = self.canvas.create_text(cx, cy, text="Q", font=("Arial", 16, "bold"), fill=color)
-            self.queen_items.append(tid)
-
-    def flash_scene(self, color):
-        overlay = self.canvas.create_rectangle(
-            0, 0, self.n*self.cell, self.n*self.cell,
-            fill=color, outline="")
-        self.canvas.after(500, lambda: self.canvas.delete(overlay))
-
-def conflict_partial(state):
-    """Đếm số cặp quân hậu tấn công nhau trong state hiện tại"""
-    conflicts = 0
-    n = len(state)
-    for i in range(n):
-        for j in range(i + 1, n):
-            if state[i] == state[j] or abs(state[i] - state[j]) == abs(i - j):
-                conflicts += 1
-    return conflicts
-
-def goal_distance_heuristic(state, goal):
-    """Heuristic = số mismatch + số xung đột"""
-    k = len(state)
-    mismatches = sum(1 for i in range(k) if state[i] != goal[i])
-    return mismatches + conflict_partial(state)
+def child_score(score, state, col, goal):
+    """Score của state + [col] từ score của cha: cộng mismatch và xung đột của hậu mới"""
+    return score + (col != goal[len(state)]) + queen_conflicts(state, col)
 
 def beam_steps(goal, n=8, beam_width=3):
-    beam = [[]]
+    """Beam search, mỗi node là (score, state) với score = số mismatch + số xung đột (child_score).
 
-    while beam:
-        new_beam = []
-        for state in beam:
-            row = len(state)
-            if row == n:
+    Mọi state trong beam cùng độ dài nên cột an toàn của cả beam được tính bằng một
+    lần gọi safe_pairs. Score của con được cộng dồn từ cha (chỉ xét hậu mới đặt)
+    nên không phải tính lại cả state, và beam được chọn bằng heapq.nsmallest thay
+    vì sắp xếp cả tầng.
+    """
+    beam = [(0, [])]
+    by_score = itemgetter(0)
+
+    for row in range(n + 1):
+        if row == n:
+            for score, state in beam:
                 if tuple(state) == goal:
-                    h = goal_distance_heuristic(state, goal)
-                    path = [(i, state[i], h) for i in range(n)]
+                    path = [(i, state[i], score) for i in range(n)]
                     yield state, True, path
                     return
-                continue
-            for col in range(n):
-                if is_safe(state, row, col):
-                    new_state = state + [col]
-                    new_beam.append(new_state)
+            break
+
+        new_beam = []
+        for i, col in safe_pairs([state for _, state in beam], n):
+            score, state = beam[i]
+            new_beam.append((child_score(score, state, col, goal), state + [col]))
 
         if not new_beam:
             break
 
-        scored = sorted(new_beam, key=lambda s: goal_distance_heuristic(s, goal))
-        beam = scored[:beam_width]
+        # nsmallest ổn định như sorted nên thứ tự giữa các node bằng điểm không đổi
+        beam = heapq.nsmallest(beam_width, new_beam, key=by_score)
 
-        for s in beam:
-            h = goal_distance_heuristic(s, goal)
-            path = [(i, s[i], h) for i in range(len(s))]
+        for score, s in beam:
+            path = [(i, s[i], score) for i in range(len(s))]
             yield s, False, path
 
     yield [], False, []
@@ -115,11 +60,13 @@ def main():
     frame.pack()
     board_left = BoardCanvas(frame, n=8, cell_size=40)
     board_right = BoardCanvas(frame, n=8, cell_size=40)
+    controller = RunController(root, board_left, delay=10)
 
-    all_sols = solve_n_queens_all(8)
+    all_sols = load_solutions(8)
     goal_holder = {"sol": None, "gen": None, "last_path": None}
 
     def random_goal():
+        controller.stop()
         sol = random.choice(all_sols)
         goal_holder["sol"] = sol
         board_right.show_partial(sol, color="blue")
@@ -131,23 +78,14 @@ def main():
         if not sol:
             return
         goal_holder["gen"] = beam_steps(sol, 8, 5)
-        step()
+        controller.start(goal_holder["gen"], on_finish=finish)
 
-    def step():
-        gen = goal_holder.get("gen")
-        if not gen:
-            return
-        try:
-            state, done, path = next(gen)
-            board_left.show_partial(state, color="red")
-            if done:
-                goal_holder["last_path"] = path
-                board_left.flash_scene("lightgreen")
-                return
-            root.after(10, step)
-        except StopIteration:
+    def finish(item, exhausted):
+        if exhausted:
             board_left.flash_scene("red")
             return
+        goal_holder["last_path"] = item[2]
+        board_left.flash_scene("lightgreen")
 
     def export_result():
         path = goal_holder.get("last_path")
@@ -165,6 +103,7 @@ def main():
     tk.Button(btn_frame, text="Random Goal", command=random_goal).pack(side="left", padx=10, pady=10)
     tk.Button(btn_frame, text="Run", command=run).pack(side="left", padx=10, pady=10)
     tk.Button(btn_frame, text="Export Result", command=export_result).pack(side="left", padx=10, pady=10)
+    controller.controls(btn_frame)
 
     root.mainloop()
 
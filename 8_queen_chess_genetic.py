@@ -1,87 +1,21 @@
 import tkinter as tk
 import random
-import csv
-
-def is_safe(state, row, col):
-    for r, c in enumerate(state):
-        if c == col or abs(c - col) == abs(r - row):
-            return False
-    return True
-
-def solve_n_queens_all(n=8):
-    sols = []
-    def backtrack(state):
-        row = len(state)
-        if row == n:
-            sols.append(tuple(state))
-            return
-        for col in range(n):
-            if is_safe(state, row, col):
-                state.append(col)
-                backtrack(state)
-                state.pop()
-    backtrack([])
-    return sols
-
-class BoardCanvas:
-    def __init__(self, parent, n=8, cell_size=40):
-        self.n = n
-        self.cell = cell_size
-        self.canvas = tk.Canvas(parent, width=n*cell_size, height=n*cell_size)
-        self.canvas.pack()
-        self.queen_items = []
-        self._draw_grid()
-
-    def _draw_grid(self):
-        self.canvas.delete("cell")
-        for r in range(self.n):
-            for c in range(self.n):
-                x1, y1 = c*self.cell, r*self.cell
-                x2, y2 = x1+self.cell, y1+self.cell
-                color = "white" if (r+c)%2==0 else "gray"
-                self.canvas.create_rectangle(x1,y1,x2,y2, fill=color, tags="cell")
-
-    def clear_queens(self):
-        for item in self.queen_items:
-            self.canvas.delete(item)
-        self.queen_items = []
-
-    def show_partial(self, state, color="red"):
-        self.clear_queens()
-        for r, c in enumerate(state):
-            cx = c*self.cell + self.cell/2
-            cy = r*self.cell + self.cell/2
-            tid = self.canvas.create_text(cx, cy, text="Q", font=("Arial", 16, "bold"), fill=color)
-            self.queen_items.append(tid)
-
-    def flash_scene(self, color):
-        overlay = self.canvas.create_rectangle(
-            0, 0, self.n*self.cell, self.n*self.cell,
-            fill=color, outline="")
-        self.canvas.after(500, lambda: self.canvas.delete(overlay))
-
-def distance_to_goal_fitness(state, goal_state):
-    if len(state) != len(goal_state):
-        raise ValueError("State và Goal State phải có cùng kích thước.")
-    total_distance = sum(abs(state[i] - goal_state[i]) for i in range(len(state)))
-    return total_distance
-
-def selection(population_with_fitness, k=3):
-    tournament_contenders = random.sample(population_with_fitness, k)
-    winner = min(tournament_contenders, key=lambda item: item[1])
-    return winner[0] 
-
-def crossover(parent1, parent2):
-    n = len(parent1)
-    crossover_point = random.randint(1, n - 1)
-    return parent1[:crossover_point] + parent2[crossover_point:]
-
-def mutate(individual, mutation_rate=0.1):
-    if random.random() < mutation_rate:
-        n = len(individual)
-        mutation_row = random.randint(0, n - 1)
-        individual[mutation_row] = random.randint(0, n - 1)
-    return individual
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from queen_chess_ga import crossover, distance_to_goal_fitness, mutate, selection
+from queen_chess_log import TraceLog
+from queen_chess_solutions import load_solutions
+from queen_chess_ui import BoardCanvas, RunController
+
+LOG_COLUMNS = [
+    ("generation", lambda r: r.step),
+    ("fitness", lambda r: r.cost),
+    ("state", lambda r: list(r.state)),
+]
 
 def genetic_algorithm_steps(goal, n=8, population_size=100, max_generations=1000, mutation_rate=0.1):
     population = [[random.randrange(n) for _ in range(n)] for _ in range(population_size)]
@@ -116,6 +50,64 @@ def genetic_algorithm_steps(goal, n=8, population_size=100, max_generations=1000
     yield final_best_state[:], False, path[:]
     return
 
+def genetic_algorithm_steps_vectorized(goal, n=8, population_size=100, max_generations=1000,
+                                       mutation_rate=0.1, k=3):
+    """GA chạy theo lô bằng NumPy, cùng giao thức yield với genetic_algorithm_steps.
+
+    Quần thể là ma trận (population_size, n) kiểu int8 (int16 khi n > 128). Fitness,
+    chọn lọc giải đấu k cá thể, lai một điểm và đột biến đều làm trên cả ma trận;
+    hai cá thể tốt nhất được giữ lại bằng argpartition. Không có NumPy thì chạy
+    genetic_algorithm_steps.
+    """
+    if np is None:
+        yield from genetic_algorithm_steps(goal, n, population_size, max_generations, mutation_rate)
+        return
+
+    # Lấy seed từ random để các lần chạy đã cố định random.seed vẫn lặp lại được
+    rng = np.random.default_rng(random.getrandbits(64))
+    dtype = np.int8 if n <= 128 else np.int16
+    goal_row = np.asarray(goal, dtype=np.int16)
+    columns = np.arange(n)
+    children_count = population_size - 2
+
+    def fitness_of(population):
+        return np.abs(population - goal_row).sum(axis=1)
+
+    def best_step(population, fitness, generation):
+        best = int(fitness.argmin())
+        state = population[best].tolist()
+        return state, [(i, state[i], int(fitness[best]), generation) for i in range(n)]
+
+    population = rng.integers(0, n, size=(population_size, n), dtype=dtype)
+    fitness = fitness_of(population)
+    state, path = best_step(population, fitness, 1)
+    yield state, False, path
+
+    for generation in range(max_generations):
+        elite = np.argpartition(fitness, 1)[:2]
+        state, path = best_step(population, fitness, generation + 1)
+        if fitness[elite[0]] == 0:
+            yield state, True, path
+            return
+        yield state, False, path
+
+        # Chọn lọc giải đấu cho cả hai cha mẹ của mọi con cùng lúc
+        contenders = rng.integers(0, population_size, size=(2, children_count, k))
+        winners = fitness[contenders].argmin(axis=2)
+        parents = np.take_along_axis(contenders, winners[..., None], axis=2)[..., 0]
+
+        points = rng.integers(1, n, size=children_count)
+        children = np.where(columns < points[:, None], population[parents[0]], population[parents[1]])
+
+        mutated = np.flatnonzero(rng.random(children_count) < mutation_rate)
+        children[mutated, rng.integers(0, n, size=len(mutated))] = rng.integers(0, n, size=len(mutated), dtype=dtype)
+
+        population = np.concatenate((population[elite], children))
+        fitness = fitness_of(population)
+
+    state, path = best_step(population, fitness, generation + 1)
+    yield state, False, path
+
 def main():
     root = tk.Tk()
     root.title("N-Queens Genetic Algorithm")
@@ -124,11 +116,13 @@ def main():
     frame.pack()
     board_left = BoardCanvas(frame, n=8, cell_size=40)
     board_right = BoardCanvas(frame, n=8, cell_size=40)
+    controller = RunController(root, board_left, delay=100)
 
-    all_sols = solve_n_queens_all(8)
-    goal_holder = {"sol": None, "gen": None, "log": []}
+    all_sols = load_solutions(8)
+    goal_holder = {"sol": None, "gen": None, "log": TraceLog(8, LOG_COLUMNS)}
 
     def random_goal():
+        controller.stop()
         sol = random.choice(all_sols)
         goal_holder["sol"] = sol
         board_right.show_partial(sol, color="blue")
@@ -140,42 +134,26 @@ def main():
         if not sol:
             return
         goal_holder["gen"] = genetic_algorithm_steps(sol, 8, 100, 10, 0.1)
-        step(8, 10)
+        controller.start(goal_holder["gen"], on_step=lambda item: record_step(item, 8, 10), on_finish=finish)
 
-    def step(size, generation):
-        gen = goal_holder.get("gen")
-        if not gen:
-            return
-        try:
-            state, done, path = next(gen)
-            gen_num = path[-1][3]
-            fit = path[-1][2]
-            board_left.show_partial(state, color="red")
-
-            goal_holder["log"].append({
-                "generation": gen_num,
-                "fitness": fit,
-                "state": state
-            })
-
-            if done:
-                board_left.flash_scene("lightgreen")
-                return
-            elif len(path) == size and path[7][3] == generation:
-                board_left.flash_scene("red")
-                return
-
-            root.after(100, lambda: step(size, generation))
-        except StopIteration:
+    def record_step(item, size, generation):
+        state, done, path = item
+        gen_num = path[-1][3]
+        fit = path[-1][2]
+
+        goal_holder["log"].record(gen_num, 0, state, cost=fit)
+
+        return done or (len(path) == size and path[7][3] == generation)
+
+    def finish(item, exhausted):
+        if exhausted:
             return
+        board_left.flash_scene("lightgreen" if item[1] else "red")
 
     def export_csv():
         if not goal_holder["log"]:
             return
-        with open("result.csv", "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=["generation", "fitness", "state"])
-            writer.writeheader()
-            writer.writerows(goal_holder["log"])
+        goal_holder["log"].export_csv("result.csv")
 
     btn_frame = tk.Frame(root)
     btn_frame.pack(pady=10)
@@ -183,6 +161,7 @@ def main():
     tk.Button(btn_frame, text="Random Goal", command=random_goal).pack(side="left", padx=10)
     tk.Button(btn_frame, text="Run", command=run).pack(side="left", padx=10)
     tk.Button(btn_frame, text="Xuất CSV", command=export_csv).pack(side="left", padx=10)
+    controller.controls(btn_frame)
 
     root.mainloop()
 
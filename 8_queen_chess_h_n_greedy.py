@@ -1,91 +1,38 @@
+import heapq
 import tkinter as tk
 import random
-
-def is_safe(state, row, col):
-    for r, c in enumerate(state):
-        if c == col or abs(c - col) == abs(r - row):
-            return False
-    return True
-
-def solve_n_queens_all(n=8):
-    sols = []
-    def backtrack(state):
+from itertools import count
+from queen_chess_core import EMPTY_MASKS, expand
+from queen_chess_solutions import load_solutions
+from queen_chess_ui import BoardCanvas, RunController
+
+def greed_steps(goal, n=8, max_frontier=None):
+    """Tìm kiếm tham lam tốt nhất trước trên heap.
+
+    h của một node là tổng abs(goal[row] - col) dọc theo đường đi, được cộng dần
+    từ node cha; khoá heap là (h, -row, thứ tự chèn) nên khi bằng h thì ưu tiên
+    node sâu hơn. Với max_frontier, heap chỉ giữ max_frontier node tốt nhất (có
+    thể bỏ sót goal nhưng bộ nhớ bị chặn).
+    """
+    counter = count()
+    heap = [(0, 0, next(counter), [], [], EMPTY_MASKS)]
+    while heap:
+        h, _, _, state, path, masks = heapq.heappop(heap)
         row = len(state)
-        if row == n:
-            sols.append(tuple(state))
-            return
-        for col in range(n):
-            if is_safe(state, row, col):
-                state.append(col)
-                backtrack(state)
-                state.pop()
-    backtrack([])
-    return sols
-
-class BoardCanvas:
-    def __init__(self, parent, n=8, cell_size=40):
-        self.n = n
-        self.cell = cell_size
-        self.canvas = tk.Canvas(parent, width=n*cell_size, height=n*cell_size)
-        self.canvas.pack()
-        self.queen_items = []
-        self._draw_grid()
-
-    def _draw_grid(self):
-        self.canvas.delete("cell")
-        for r in range(self.n):
-            for c in range(self.n):
-                x1, y1 = c*self.cell, r*self.cell
-                x2, y2 = x1+self.cell, y1+self.cell
-                color = "white" if (r+c)%2==0 else "gray"
-                self.canvas.create_rectangle(x1,y1,x2,y2, fill=color, tags="cell")
-
-    def clear_queens(self):
-        for item in self.queen_items:
-            self.canvas.delete(item)
-        self.queen_items = []
-
-    def show_partial(self, state, color="red"):
-        self.clear_queens()
-        for r, c in enumerate(state):
-            cx = c*self.cell + self.cell/2
-            cy = r*self.cell + self.cell/2
-            tid = self.canvas.create_text(cx, cy, text="Q", font=("Arial", 16, "bold"), fill=color)
-            self.queen_items.append(tid)
-
-    def flash_scene(self, color):
-        overlay = self.canvas.create_rectangle(
-            0, 0, self.n*self.cell, self.n*self.cell,
-            fill=color, outline="")
-        self.canvas.after(500, lambda: self.canvas.delete(overlay))
-
-def func_h(cells, c):
-    def safe_key(c):
-        try:
-            return c[2][2]
-        except Exception:
-            return float('inf')
-    c.sort(reverse=True, key=safe_key)
-    return cells + c
-
-def greed_steps(goal, n=8):
-    cells = [(0, [], [])]
-    while cells:
-        row, state, path = cells.pop()
         if row == n:
             if tuple(state) == goal:
                 yield state, True, path
                 return
             continue
-        c = []
-        for col in range(n):
-            if is_safe(state, row, col):
-                new_state = state + [col]
-                new_cost = abs(goal[row] - col)
-                new_path = path + [(row, col, new_cost)]
-                yield new_state, False, new_path
-                c.append((row + 1, new_state, new_path))
-        cells = func_h(cells, c)
+        for col, child_masks in expand(masks, n):
+            new_state = state + [col]
+            new_cost = abs(goal[row] - col)
+            new_path = path + [(row, col, new_cost)]
+            yield new_state, False, new_path
+            heapq.heappush(heap, (h + new_cost, -row - 1, next(counter), new_state, new_path, child_masks))
+        if max_frontier is not None and len(heap) > 2 * max_frontier:
+            # Cắt theo lô để chi phí cắt được chia đều; danh sách đã sắp xếp vẫn là heap hợp lệ
+            heap = heapq.nsmallest(max_frontier, heap)
 
 def main():
     root = tk.Tk()
@@ -95,11 +42,13 @@ def main():
     frame.pack()
     board_left = BoardCanvas(frame, n=8, cell_size=40)
     board_right = BoardCanvas(frame, n=8, cell_size=40)
+    controller = RunController(root, board_left, delay=10)
 
-    all_sols = solve_n_queens_all(8)
+    all_sols = load_solutions(8)
     goal_holder = {"sol": None, "gen": None, "path": None}
 
     def random_goal():
+        controller.stop()
         sol = random.choice(all_sols)
         goal_holder["sol"] = sol
         board_right.show_partial(sol, color="blue")
@@ -111,22 +60,12 @@ def main():
         if not sol:
             return
         goal_holder["gen"] = greed_steps(sol, 8)
-        step()
+        controller.start(goal_holder["gen"], on_finish=finish)
 
-    def step():
-        gen = goal_holder.get("gen")
-        if not gen:
-            return
-        try:
-            state, done, path = next(gen)
-            board_left.show_partial(state, color="red")
-            if done:
-                goal_holder["path"] = path
-                board_left.flash_scene("lightgreen")
-                return
-            root.after(10, step)
-        except StopIteration:
-            return
+    def finish(item, exhausted):
+        if not exhausted:
+            goal_holder["path"] = item[2]
+            board_left.flash_scene("lightgreen")
 
     def export_file():
         path = goal_holder.get("path")
@@ -146,6 +85,7 @@ def main():
     tk.Button(btn_frame, text="Random Goal", command=random_goal).pack(side="left", padx=10, pady=10)
     tk.Button(btn_frame, text="Run", command=run).pack(side="left", padx=10, pady=10)
     tk.Button(btn_frame, text="Xuất File", command=export_file).pack(side="left", padx=10, pady=10)
+    controller.controls(btn_frame)
 
     root.mainloop()
 
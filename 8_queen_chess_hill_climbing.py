@@ -1,107 +1,107 @@
 import tkinter as tk
 import random
-import csv
-
-def is_safe(state, row, col):
+from operator import add
+from queen_chess_log import TraceLog
+from queen_chess_solutions import load_solutions
+from queen_chess_ui import BoardCanvas, RunController
+
+LOG_COLUMNS = [
+    ("step", lambda r: r.step),
+    ("conflicts", lambda r: r.cost),
+    ("state", lambda r: list(r.state)),
+]
+
+def attack_counters(state, n):
+    """Số hậu trên mỗi cột, mỗi đường chéo down (r - c + n - 1) và up (r + c)"""
+    cols = [0] * n
+    down = [0] * (2 * n - 1)
+    up = [0] * (2 * n - 1)
     for r, c in enumerate(state):
-        if c == col or abs(c - col) == abs(r - row):
-            return False
-    return True
-
-def solve_n_queens_all(n=8):
-    sols = []
-    def backtrack(state):
-        row = len(state)
-        if row == n:
-            sols.append(tuple(state))
-            return
-        for col in range(n):
-            if is_safe(state, row, col):
-                state.append(col)
-                backtrack(state)
-                state.pop()
-    backtrack([])
-    return sols
-
-class BoardCanvas:
-    def __init__(self, parent, n=8, cell_size=40):
-        self.n = n
-        self.cell = cell_size
-        self.canvas = tk.Canvas(parent, width=n*cell_size, height=n*cell_size)
-        self.canvas.pack()
-        self.queen_items = []
-        self._draw_grid()
-
-    def _draw_grid(self):
-        self.canvas.delete("cell")
-        for r in range(self.n):
-            for c in range(self.n):
-                x1, y1 = c*self.cell, r*self.cell
-                x2, y2 = x1+self.cell, y1+self.cell
-                color = "white" if (r+c)%2==0 else "gray"
-                self.canvas.create_rectangle(x1,y1,x2,y2, fill=color, tags="cell")
-
-    def clear_queens(self):
-        for item in self.queen_items:
-            self.canvas.delete(item)
-        self.queen_items = []
-
-    def show_partial(self, state, color="red"):
-        self.clear_queens()
-        for r, c in enumerate(state):
-            cx = c*self.cell + self.cell/2
-            cy = r*self.cell + self.cell/2
-            tid = self.canvas.create_text(cx, cy, text="Q", font=("Arial", 16, "bold"), fill=color)
-            self.queen_items.append(tid)
-
-    def flash_scene(self, color):
-        overlay = self.canvas.create_rectangle(
-            0, 0, self.n*self.cell, self.n*self.cell,
-            fill=color, outline="")
-        self.canvas.after(500, lambda: self.canvas.delete(overlay))
-
-def conflict(state):
-    conflicts = 0
-    n = len(state)
-    for i in range(n):
-        for j in range(i+1, n):
-            if state[i] == state[j] or abs(state[i]-state[j]) == abs(i-j):
-                conflicts += 1
-    return conflicts
-
-def hill_climb_steps(goal, n=8):
-    state = [random.randrange(n) for _ in range(n)]
-    path = [(i, state[i], conflict(state)) for i in range(n)]
-    yield state[:], False, path[:]
-
+        cols[c] += 1
+        down[r - c + n - 1] += 1
+        up[r + c] += 1
+    return cols, down, up
+
+def row_attacks(row, cols, down, up, n):
+    """Số hậu ăn ô (row, c) cho mọi cột c, tính cả hậu đang đứng ở hàng row"""
+    diag = down[row + n - 1:row - 1 if row else None:-1]
+    return list(map(add, cols, map(add, diag, up[row:row + n])))
+
+def move_queen(state, cols, down, up, row, col, n):
+    """Chuyển hậu hàng row sang cột col, cập nhật các bộ đếm trong O(1)"""
+    old = state[row]
+    cols[old] -= 1
+    down[row - old + n - 1] -= 1
+    up[row + old] -= 1
+    cols[col] += 1
+    down[row - col + n - 1] += 1
+    up[row + col] += 1
+    state[row] = col
+
+def best_moves(state, cols, down, up, n, rows):
+    """Độ thay đổi số xung đột nhỏ nhất và mọi nước (row, col) đạt được nó trong các hàng rows"""
+    best, moves = None, []
+    for row in rows:
+        values = row_attacks(row, cols, down, up, n)
+        current = values[state[row]] - 3
+        values[state[row]] = 3 * n
+        low = min(values)
+        delta = low - current
+        if best is None or delta < best:
+            best, moves = delta, []
+        if delta == best:
+            moves.extend((row, col) for col, v in enumerate(values) if v == low)
+    return best, moves
+
+def random_conflicted_row(state, cols, down, up, n):
     while True:
-        current_conf = conflict(state)
-        if current_conf == 0:
-            ok = (tuple(state) == goal)
-            yield state[:], ok, path[:]
-            return
-
-        neighbors = []
-        for row in range(n):
-            for col in range(n):
-                if col != state[row]:
-                    new_state = state[:]
-                    new_state[row] = col
-                    neighbors.append((new_state, conflict(new_state), row, col))
-
-        if not neighbors:
-            yield state[:], False, path[:]
-            return
-
-        new_state, new_conf, r, c = min(neighbors, key=lambda x: x[1])
-
-        if new_conf < current_conf:
-            state = new_state
-            path.append((r, c, new_conf))
-            yield state[:], False, path[:]
-        else:
-            yield state[:], False, path[:]
+        row = random.randrange(n)
+        c = state[row]
+        if cols[c] + down[row - c + n - 1] + up[row + c] > 3:
+            return row
+
+def hill_climb_steps(goal=None, n=8, max_sideways=100, max_restarts=1000, steepest=None):
+    """Leo đồi trên các bộ đếm cột / đường chéo, có đi ngang và khởi động lại.
+
+    Số hậu ăn một ô đọc từ bộ đếm trong O(1), di chuyển một hậu chỉ cập nhật vài
+    ô. steepest (mặc định khi n <= 64) xét mọi (row, col) và chọn nước tốt nhất;
+    ngược lại chỉ xét các cột của một hàng đang bị ăn chọn ngẫu nhiên (min-conflicts)
+    để chạy được với n lớn. Khi không còn nước tốt hơn thì cho đi ngang tối đa
+    max_sideways nước liên tiếp, hết thì khởi động lại ngẫu nhiên (tối đa
+    max_restarts lần); có goal thì lời giải khác goal cũng dẫn tới khởi động lại.
+    state và path yield ra là list dùng chung, path bắt đầu lại sau mỗi lần khởi động.
+    """
+    if steepest is None:
+        steepest = n <= 64
+    for restart in range(max_restarts + 1):
+        state = [random.randrange(n) for _ in range(n)]
+        cols, down, up = attack_counters(state, n)
+        total = sum(k * (k - 1) // 2 for counts in (cols, down, up) for k in counts)
+        path = [(i, state[i], total) for i in range(n)]
+        yield state, False, path
+
+        sideways = 0
+        while total:
+            rows = range(n) if steepest else (random_conflicted_row(state, cols, down, up, n),)
+            delta, moves = best_moves(state, cols, down, up, n, rows)
+            if delta > 0 or (delta == 0 and sideways >= max_sideways):
+                if steepest:
+                    break
+                sideways += 1
+                if sideways > max_sideways:
+                    break
+                continue
+            sideways = sideways + 1 if delta == 0 else 0
+            row, col = random.choice(moves)
+            move_queen(state, cols, down, up, row, col, n)
+            total += delta
+            path.append((row, col, total))
+            yield state, False, path
+
+        if total == 0 and (goal is None or tuple(state) == tuple(goal)):
+            yield state, True, path
             return
+    yield state, False, path
 
 def main():
     root = tk.Tk()
@@ -111,11 +111,13 @@ def main():
     frame.pack()
     board_left = BoardCanvas(frame, n=8, cell_size=40)
     board_right = BoardCanvas(frame, n=8, cell_size=40)
+    controller = RunController(root, board_left, delay=200)
 
-    all_sols = solve_n_queens_all(8)
-    goal_holder = {"sol": None, "gen": None, "log": []}
+    all_sols = load_solutions(8)
+    goal_holder = {"sol": None, "gen": None, "log": TraceLog(8, LOG_COLUMNS)}
 
     def random_goal():
+        controller.stop()
         sol = random.choice(all_sols)
         goal_holder["sol"] = sol
         board_right.show_partial(sol, color="blue")
@@ -127,43 +129,27 @@ def main():
         if not sol:
             return
         goal_holder["gen"] = hill_climb_steps(sol, 8)
-        step(8)
+        controller.start(goal_holder["gen"], on_step=record_step, on_finish=finish)
 
-    def step(size):
-        gen = goal_holder.get("gen")
-        if not gen:
-            return
-        try:
-            state, done, path = next(gen)
-            step_num = len(path)
-            conf = path[-1][2]
-
-            goal_holder["log"].append({
-                "step": step_num,
-                "conflicts": conf,
-                "state": state
-            })
-
-            board_left.show_partial(state, color="red")
-
-            if done:
-                board_left.flash_scene("lightgreen")
-                return
-            elif len(path) == size:
-                board_left.flash_scene("red")
-                return
-
-            root.after(200, lambda: step(size))
-        except StopIteration:
+    def record_step(item):
+        state, done, path = item
+        step_num = len(path)
+        conf = path[-1][2]
+
+        goal_holder["log"].record(step_num, 0, state, cost=conf)
+
+        # Generator tự dừng khi tới goal hoặc hết số lần khởi động lại
+        return done
+
+    def finish(item, exhausted):
+        if exhausted:
             return
+        board_left.flash_scene("lightgreen" if item[1] else "red")
 
     def export_csv():
         if not goal_holder["log"]:
             return
-        with open("result.csv", "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=["step", "conflicts", "state"])
-            writer.writeheader()
-            writer.writerows(goal_holder["log"])
+        goal_holder["log"].export_csv("result.csv")
 
     btn_frame = tk.Frame(root)
     btn_frame.pack(pady=10)
@@ -171,6 +157,7 @@ def main():
     tk.Button(btn_frame, text="Random Goal", command=random_goal).pack(side="left", padx=10)
     tk.Button(btn_frame, text="Run", command=run).pack(side="left", padx=10)
     tk.Button(btn_frame, text="Xuất CSV", command=export_csv).pack(side="left", padx=10)
+    controller.controls(btn_frame)
 
     root.mainloop()
 
@@ -1,85 +1,89 @@
 import tkinter as tk
 import random
 import csv
-
-def is_safe(state, row, col):
-    for r, c in enumerate(state):
-        if c == col or abs(c - col) == abs(r - row):
-            return False
-    return True
-
-def solve_n_queens_all(n=8):
-    sols = []
-    def backtrack(state):
-        row = len(state)
-        if row == n:
-            sols.append(tuple(state))
-            return
-        for col in range(n):
-            if is_safe(state, row, col):
-                state.append(col)
-                backtrack(state)
-                state.pop()
-    backtrack([])
-    return sols
-
-class BoardCanvas:
-    def __init__(self, parent, n=8, cell_size=40):
-        self.n = n
-        self.cell = cell_size
-        self.canvas = tk.Canvas(parent, width=n*cell_size, height=n*cell_size)
-        self.canvas.pack()
-        self.queen_items = []
-        self._draw_grid()
-
-    def _draw_grid(self):
-        self.canvas.delete("cell")
-        for r in range(self.n):
-            for c in range(self.n):
-                x1, y1 = c*self.cell, r*self.cell
-                x2, y2 = x1+self.cell, y1+self.cell
-                color = "white" if (r+c)%2==0 else "gray"
-                self.canvas.create_rectangle(x1,y1,x2,y2, fill=color, tags="cell")
-
-    def clear_queens(self):
-        for item in self.queen_items:
-            self.canvas.delete(item)
-        self.queen_items = []
-
-    def show_partial(self, state, color="red"):
-        self.clear_queens()
-        for r, c in enumerate(state):
-            cx = c*self.cell + self.cell/2
-            cy = r*self.cell + self.cell/2
-            tid = self.canvas.create_text(cx, cy, text="Q", font=("Arial", 16, "bold"), fill=color)
-            self.queen_items.append(tid)
-
-    def flash_scene(self, color):
-        overlay = self.canvas.create_rectangle(
-            0, 0, self.n*self.cell, self.n*self.cell,
-            fill=color, outline=""
-        )
-        self.canvas.after(500, lambda: self.canvas.delete(overlay))
-
-def ids_steps(goal, n=8):
-    """Iterative Deepening Search cho N-Queens"""
+from array import array
+from queen_chess_core import (EMPTY_MASKS, code_powers, decode_state, encode_state, expand, place,
+                              push_col, state_masks)
+from queen_chess_solutions import load_solutions
+from queen_chess_ui import BoardCanvas, RunController
+
+def frontier_array(n):
+    """Mảng chứa mã state: array 64 bit khi mã vừa, ngược lại là list số nguyên"""
+    return array("Q") if (n + 1) ** n < 2 ** 64 else []
+
+def ids_steps(goal, n=8, resume=False, max_frontier=1_000_000, progress=None):
+    """Iterative Deepening Search cho N-Queens.
+
+    Với resume=True, các node ở độ sâu limit - 1 (biên cắt của lượt trước) được lưu
+    dưới dạng mã state theo đúng thứ tự DFS, lượt sau chỉ mở rộng tiếp từ biên đó
+    thay vì duyệt lại từ gốc, nên chỉ yield các node ở độ sâu mới. Khi biên vượt
+    quá max_frontier node thì quay về cách chạy lại từ gốc cho các lượt còn lại.
+    progress(limit, expanded, saved) được gọi sau mỗi lượt, saved là số node nông
+    hơn không phải mở rộng lại.
+    """
+    goal_code = encode_state(goal, n)
+    frontier = frontier_array(n) if resume else None
+    if frontier is not None:
+        frontier.append(0)
+    layers = [1]
     for limit in range(1, n + 1):
-        stack = [(0, [], [])]
-        while stack:
-            row, state, path = stack.pop()
-            if row == n:
-                if tuple(state) == goal:
-                    yield state, True, path
-                    return
-                continue
-            if row >= limit:
-                continue
-            for col in range(n):
-                if is_safe(state, row, col):
+        if frontier is None:
+            expanded = 0
+            stack = [(0, [], [], EMPTY_MASKS)]
+            while stack:
+                row, state, path, masks = stack.pop()
+                if row == n:
+                    if tuple(state) == goal:
+                        yield state, True, path
+                        return
+                    continue
+                if row >= limit:
+                    continue
+                expanded += 1
+                for col, child_masks in expand(masks, n):
                     new_state = state + [col]
                     new_path = path + [(row, col)]
                     yield new_state, False, new_path
-                    stack.append((row + 1, new_state, new_path))
+                    stack.append((row + 1, new_state, new_path, child_masks))
+            if progress is not None:
+                progress(limit, expanded, 0)
+            continue
+
+        row = limit - 1
+        next_frontier = frontier_array(n)
+        layer_size = 0
+        # Anh em liền nhau trong biên có chung cha: chỉ giải mã cha một lần rồi đặt thêm hậu cuối
+        power = code_powers(n)[row - 1] if row else 0
+        parent_code, parent_state, parent_masks = None, [], EMPTY_MASKS
+        for code in frontier:
+            if row:
+                digit = code // power % (n + 1)
+                if code - digit * power != parent_code:
+                    parent_code = code - digit * power
+                    parent_state = decode_state(parent_code, n)
+                    parent_masks = state_masks(parent_state, n)
+                state = parent_state + [digit - 1]
+                masks = place(parent_masks, digit - 1, n)
+            else:
+                state, masks = [], EMPTY_MASKS
+            path = list(enumerate(state))
+            children = []
+            for col, _ in expand(masks, n):
+                yield state + [col], False, path + [(row, col)]
+                children.append(push_col(code, row, col, n))
+            if goal_code in children:
+                yield decode_state(goal_code, n), True, path + [(row, goal[row])]
+                return
+            layer_size += len(children)
+            if next_frontier is not None:
+                # Con được đẩy vào ngăn xếp theo cột tăng dần nên DFS lấy ra theo thứ tự ngược lại
+                next_frontier.extend(reversed(children))
+                if len(next_frontier) > max_frontier:
+                    next_frontier = None
+        if progress is not None:
+            progress(limit, len(frontier), sum(layers[:-1]))
+        layers.append(layer_size)
+        frontier = next_frontier
 
 def main():
     root = tk.Tk()
@@ -89,11 +93,13 @@ def main():
     frame.pack()
     board_left = BoardCanvas(frame, n=8, cell_size=40)
     board_right = BoardCanvas(frame, n=8, cell_size=40)
+    controller = RunController(root, board_left, delay=10)
 
-    all_sols = solve_n_queens_all(8)
+    all_sols = load_solutions(8)
     goal_holder = {"sol": None, "gen": None, "last_path": None}
 
     def random_goal():
+        controller.stop()
         sol = random.choice(all_sols)
         goal_holder["sol"] = sol
         board_right.show_partial(sol, color="blue")
@@ -105,22 +111,12 @@ def main():
         if not sol:
             return
         goal_holder["gen"] = ids_steps(sol, 8)
-        step()
+        controller.start(goal_holder["gen"], on_finish=finish)
 
-    def step():
-        gen = goal_holder.get("gen")
-        if not gen:
-            return
-        try:
-            state, done, path = next(gen)
-            board_left.show_partial(state, color="red")
-            if done:
-                board_left.flash_scene("lightgreen")
-                goal_holder["last_path"] = path
-                return
-            root.after(10, step)
-        except StopIteration:
-            return
+    def finish(item, exhausted):
+        if not exhausted:
+            board_left.flash_scene("lightgreen")
+            goal_holder["last_path"] = item[2]
 
     def export_csv():
         path = goal_holder.get("last_path")
@@ -138,6 +134,7 @@ def main():
     tk.Button(btn_frame, text="Random Goal", command=random_goal).pack(side="left", padx=10, pady=10)
     tk.Button(btn_frame, text="Run", command=run).pack(side="left", padx=10, pady=10)
     tk.Button(btn_frame, text="Export CSV", command=export_csv).pack(side="left", padx=10, pady=10)
+    controller.controls(btn_frame)
 
     root.mainloop()
 
@@ -0,0 +1,162 @@
+import tkinter as tk
+import random
+import sys
+import time
+from array import array
+from collections import deque
+from queen_chess_anneal import swap_rows
+from queen_chess_ui import BoardCanvas, RunController
+
+def greedy_placement(n, tries=128):
+    """Đặt hậu theo từng hàng thành một hoán vị, ưu tiên cột chưa bị ăn theo đường chéo.
+
+    Mỗi hàng thử tối đa tries cột ngẫu nhiên trong số cột còn trống; không tìm được
+    thì lấy cột cuối cùng đã thử. Trả về state cùng các bộ đếm đường chéo down
+    (r - c + n - 1) và up (r + c).
+    """
+    state = array("l", range(n))
+    down = array("l", [0]) * (2 * n - 1)
+    up = array("l", [0]) * (2 * n - 1)
+    rand = random.random
+    offset = n - 1
+    for row in range(n):
+        # Các cột state[row:] là các cột chưa dùng
+        free = n - row
+        for _ in range(tries):
+            j = row + int(rand() * free)
+            col = state[j]
+            if not down[row - col + offset] and not up[row + col]:
+                break
+        state[j] = state[row]
+        state[row] = col
+        down[row - col + offset] += 1
+        up[row + col] += 1
+    return state, down, up
+
+def is_attacked(state, down, up, row, n):
+    col = state[row]
+    return down[row - col + n - 1] > 1 or up[row + col] > 1
+
+def min_conflicts_steps(goal=None, n=8, tries=32, place_tries=128, max_failures=None, max_restarts=1000,
+                        report_every=1, yield_states=True):
+    """Min-conflicts cho n rất lớn, bộ nhớ O(n).
+
+    Bắt đầu từ greedy_placement (thử tối đa place_tries cột cho mỗi hàng) nên chỉ
+    còn lại rất ít xung đột, và vì state là hoán vị nên chỉ có xung đột theo đường
+    chéo. Lấy một hàng trong tập các hàng đang bị ăn, thử đổi chỗ với tối đa tries
+    hàng ngẫu nhiên và giữ lại lần đổi đầu tiên làm giảm số cặp ăn nhau (tính O(1)
+    bằng swap_rows). Tập được cập nhật lười: hàng lấy ra mà không còn bị ăn thì bỏ
+    qua. Sau max_failures lần liên tiếp không cải thiện (mặc định n) thì đặt lại
+    bàn cờ từ đầu, tối đa max_restarts lần (n = 2, 3 không có lời giải) rồi kết
+    thúc bằng (state, False, path).
+
+    Yield (state, done, path) sau mỗi report_every nước đi, path giữ các nước gần
+    nhất (hàng, cột, số cặp còn lại); với yield_states=False thì state là None để
+    khỏi phải sao chép bàn cờ khổng lồ. goal chỉ để cùng chữ ký với các generator
+    khác, mọi lời giải đều được chấp nhận.
+    """
+    if max_failures is None:
+        max_failures = n
+    path = deque(maxlen=min(n, 1000))
+    randrange = random.randrange
+    for _ in range(max_restarts + 1):
+        state, down, up = greedy_placement(n, place_tries)
+        total = sum(k * (k - 1) // 2 for counts in (down, up) for k in counts if k > 1)
+        conflicted = {row for row in range(n) if is_attacked(state, down, up, row, n)}
+        moves = failures = 0
+        yield (state if yield_states else None), False, path
+
+        while total and failures < max_failures:
+            row = conflicted.pop()
+            if not is_attacked(state, down, up, row, n):
+                continue
+            for _ in range(tries):
+                other = randrange(n)
+                if other == row:
+                    continue
+                delta = swap_rows(state, down, up, row, other)
+                if delta < 0:
+                    break
+                swap_rows(state, down, up, row, other)
+            else:
+                failures += 1
+                conflicted.add(row)
+                continue
+            failures = 0
+            total += delta
+            for r in (row, other):
+                if is_attacked(state, down, up, r, n):
+                    conflicted.add(r)
+            moves += 1
+            path.append((row, state[row], total))
+            if moves % report_every == 0 and total:
+                yield (state if yield_states else None), False, path
+        if not total:
+            yield (state if yield_states else None), True, path
+            return
+    yield (state if yield_states else None), False, path
+
+def main():
+    if len(sys.argv) > 1:
+        run_headless()
+        return
+
+    root = tk.Tk()
+    root.title("N-Queens Min-Conflicts")
+
+    frame = tk.Frame(root)
+    frame.pack()
+    holder = {"board": BoardCanvas(frame, n=8, cell_size=40), "gen": None}
+    controller = RunController(root, holder["board"], delay=50)
+    size = tk.IntVar(value=8)
+
+    def resize():
+        n = size.get()
+        controller.stop()
+        holder["board"].canvas.destroy()
+        holder["board"] = BoardCanvas(frame, n=n, cell_size=max(4, 320 // n))
+        controller.board = holder["board"]
+
+    def run():
+        if holder["board"].n != size.get():
+            resize()
+        holder["gen"] = min_conflicts_steps(None, size.get())
+        controller.start(holder["gen"], on_finish=finish)
+
+    def finish(item, exhausted):
+        holder["board"].flash_scene("lightgreen" if item[1] else "red")
+
+    btn_frame = tk.Frame(root)
+    btn_frame.pack(pady=10)
+    tk.Label(btn_frame, text="n").pack(side="left")
+    tk.Spinbox(btn_frame, from_=4, to=80, width=4, textvariable=size, command=resize).pack(side="left", padx=5)
+    tk.Button(btn_frame, text="Run", command=run).pack(side="left", padx=10, pady=10)
+    controller.controls(btn_frame)
+
+    root.mainloop()
+
+def run_headless():
+    """Chạy không giao diện cho n lớn: python 8_queen_chess_min_conflicts.py -n 1000000"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Min-conflicts N-Queens cho n lớn")
+    parser.add_argument("-n", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--report-every", type=int, default=100000)
+    args = parser.parse_args()
+    if args.n in (2, 3) or args.n < 1:
+        parser.error(f"n={args.n} không có lời giải")
+
+    random.seed(args.seed)
+    start = time.perf_counter()
+    done = False
+    for _, done, path in min_conflicts_steps(None, args.n, report_every=args.report_every, yield_states=False):
+        remaining = path[-1][2] if path else "?"
+        print(f"{time.perf_counter() - start:.2f}s: còn {remaining} cặp hậu ăn nhau", file=sys.stderr)
+    if done:
+        print(f"n={args.n}: tìm được lời giải sau {time.perf_counter() - start:.2f}s")
+    else:
+        print(f"n={args.n}: không tìm được lời giải sau {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
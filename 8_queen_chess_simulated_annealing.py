@@ -2,91 +2,25 @@ import tkinter as tk
 import random
 import math
 import csv
-
-def is_safe(state, row, col):
-    for r, c in enumerate(state):
-        if c == col or abs(c - col) == abs(r - row):
-            return False
-    return True
-
-def solve_n_queens_all(n=8):
-    sols = []
-    def backtrack(state):
-        row = len(state)
-        if row == n:
-            sols.append(tuple(state))
-            return
-        for col in range(n):
-            if is_safe(state, row, col):
-                state.append(col)
-                backtrack(state)
-                state.pop()
-    backtrack([])
-    return sols
-
-class BoardCanvas:
-    def __init__(self, parent, n=8, cell_size=40):
-        self.n = n
-        self.cell = cell_size
-        self.canvas = tk.Canvas(parent, width=n*cell_size, height=n*cell_size)
-        self.canvas.pack()
-        self.queen_items = []
-        self._draw_grid()
-
-    def _draw_grid(self):
-        self.canvas.delete("cell")
-        for r in range(self.n):
-            for c in range(self.n):
-                x1, y1 = c*self.cell, r*self.cell
-                x2, y2 = x1+self.cell, y1+self.cell
-                color = "white" if (r+c)%2==0 else "gray"
-                self.canvas.create_rectangle(x1,y1,x2,y2, fill=color, tags="cell")
-
-    def clear_queens(self):
-        for item in self.queen_items:
-            self.canvas.delete(item)
-        self.queen_items = []
-
-    def show_partial(self, state, color="red"):
-        self.clear_queens()
-        for r, c in enumerate(state):
-            cx = c*self.cell + self.cell/2
-            cy = r*self.cell + self.cell/2
-            tid = self.canvas.create_text(cx, cy, text="Q", font=("Arial", 16, "bold"), fill=color)
-            self.queen_items.append(tid)
-
-    def flash_scene(self, color):
-        overlay = self.canvas.create_rectangle(
-            0, 0, self.n*self.cell, self.n*self.cell,
-            fill=color, outline="")
-        self.canvas.after(500, lambda: self.canvas.delete(overlay))
-
-def cost(state, goal_state=None):
-    n = len(state)
-    attacks = 0
-    for r1 in range(n):
-        for r2 in range(r1 + 1, n):
-            c1 = state[r1]
-            c2 = state[r2]
-            if abs(r1 - r2) == abs(c1 - c2):
-                attacks += 1
-
-    if goal_state is None:
-        return attacks
-    else:
-        distance = 0
-        for i in range(n):
-            if state[i] != goal_state[i]:
-                distance += 1
-        return attacks * n + distance
+from collections import deque
+from queen_chess_anneal import cost, diagonal_counts, swap_cost_delta, swap_rows
+from queen_chess_solutions import load_solutions
+from queen_chess_ui import BoardCanvas, RunController
 
 def simulated_annealing_steps(goal_state=None, n=8, T_max=50000.0, alpha=0.99995, max_steps=50000):
+    """Ủ nhiệt trên hoán vị: mỗi bước đổi chỗ hậu của hai hàng ngay trên state.
+
+    Độ thay đổi chi phí tính trong O(1) nhờ bộ đếm đường chéo; bước bị từ chối thì
+    đổi lại. state yield ra là list dùng chung được sửa tại chỗ, path giữ n bước
+    được chấp nhận gần nhất.
+    """
     current_state = list(range(n))
     random.shuffle(current_state)
-    
+    down, up = diagonal_counts(current_state)
+
     current_cost = cost(current_state, goal_state)
     T = T_max
-    path = [] 
+    path = deque(maxlen=n)
 
     for step in range(max_steps):
         if current_cost == 0:
@@ -97,19 +31,17 @@ def simulated_annealing_steps(goal_state=None, n=8, T_max=50000.0, alpha=0.99995
         if T <= 1e-3: 
              break
 
-        new_state = list(current_state)
-        r1, r2 = random.sample(range(n), 2)
-        new_state[r1], new_state[r2] = new_state[r2], new_state[r1]
-        
-        new_cost = cost(new_state, goal_state)
-        delta_E = new_cost - current_cost
+        r1 = random.randrange(n)
+        r2 = random.randrange(n - 1)
+        if r2 >= r1:
+            r2 += 1
+        delta_E = swap_cost_delta(current_state, down, up, r1, r2, goal_state)
 
         if delta_E < 0 or random.random() < math.exp(-delta_E / T):
-            current_state = new_state
-            current_cost = new_cost
+            current_cost += delta_E
             path.append((r1, current_state[r1], current_cost))
-            if len(path) > n:
-                path.pop(0)
+        else:
+            swap_rows(current_state, down, up, r1, r2)
 
         yield current_state, False, path
 
@@ -123,11 +55,13 @@ def main():
     frame.pack()
     board_left = BoardCanvas(frame, n=8, cell_size=40)
     board_right = BoardCanvas(frame, n=8, cell_size=40)
+    controller = RunController(root, board_left, delay=1)
 
-    all_sols = solve_n_queens_all(8)
+    all_sols = load_solutions(8)
     goal_holder = {"sol": None, "gen": None, "path": []}
 
     def random_goal():
+        controller.stop()
         sol = random.choice(all_sols)
         goal_holder["sol"] = sol
         goal_holder["path"] = []
@@ -137,29 +71,23 @@ def main():
     def run():
         sol = goal_holder.get("sol")
         if not sol: return
+        controller.stop()
         goal_holder["path"] = []
         goal_holder["gen"] = simulated_annealing_steps(sol, 8, 50000.0, 0.99995, 20000)
-        step(20000, 1)
-
-    def step(max_step, current_step):
-        gen = goal_holder.get("gen")
-        if not gen: 
-            return
-        try:
-            state, done, path = next(gen)
-            goal_holder["path"] = path
-            board_left.show_partial(state, color="red")
-
-            if done:
-                board_left.flash_scene("lightgreen")
-                return
-            elif current_step == max_step:
-                board_left.flash_scene("red")
-                return
-
-            root.after(1, step, max_step, current_step + 1)
-        except StopIteration:
+        counter = {"step": 0}
+        controller.start(goal_holder["gen"], on_step=lambda item: record_step(item, 20000, counter), on_finish=finish)
+
+    def record_step(item, max_step, counter):
+        state, done, path = item
+        # path là deque luồng nền vẫn đang sửa, lưu bản sao để export_csv duyệt an toàn
+        goal_holder["path"] = list(path)
+        counter["step"] += 1
+        return done or counter["step"] == max_step
+
+    def finish(item, exhausted):
+        if exhausted:
             return
+        board_left.flash_scene("lightgreen" if item[1] else "red")
 
     def export_csv():
         path = goal_holder.get("path", [])
@@ -178,6 +106,7 @@ def main():
     tk.Button(btn_frame, text="Random Goal", command=random_goal).pack(side="left", padx=10)
     tk.Button(btn_frame, text="Run", command=run).pack(side="left", padx=10)
     tk.Button(btn_frame, text="Xuất CSV", command=export_csv).pack(side="left", padx=10)
+    controller.controls(btn_frame)
 
     root.mainloop()
 
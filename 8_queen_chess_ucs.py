@@ -1,137 +1,87 @@
-import csv
 import heapq
+from array import array
 import tkinter as tk
 import random
-
-def is_safe(state, row, col):
-    for r, c in enumerate(state):
-        if c == col or abs(c - col) == abs(r - row):
-            return False
-    return True
-
-def solve_n_queens_all(n=8):
-    sols = []
-    def backtrack(state):
-        row = len(state)
-        if row == n:
-            sols.append(tuple(state))
-            return
-        for col in range(n):
-            if is_safe(state, row, col):
-                state.append(col)
-                backtrack(state)
-                state.pop()
-    backtrack([])
-    return sols
-
-def calc_attack_cost(row, col, path):
-    if not path:
-        return 1
-    penalty = sum(abs(col - c) <= 1 for _, c, _ in path)
-    return 1 + penalty
-
-def ucs_steps(goal, n=8, log_list=None):
-    pq = []
-    heapq.heappush(pq, (0, [], [])) 
+from queen_chess_core import decode_state, encode_state, expand, push_col, state_masks
+from queen_chess_log import EXAMINE, GOAL, TRY_COLUMN_COST, StreamingLogSink, step_columns
+from queen_chess_solutions import load_solutions
+from queen_chess_ui import BoardCanvas, RunController, show_log_popup
+
+def calc_attack_cost(cols, col):
+    """Chi phí đặt hậu ở cột col: 1 + số hậu đã có ở các cột col-1, col, col+1 (cols là mặt nạ cột)"""
+    return 1 + bin(cols & ((7 << col) >> 1)).count("1")
+
+def build_path(node, parents, cols, step_costs):
+    """Dựng lại đường đi [(row, col, chi phí bước)] bằng cách lần theo con trỏ cha"""
+    path = []
+    while parents[node] >= 0:
+        path.append((cols[node], step_costs[node]))
+        node = parents[node]
+    path.reverse()
+    return [(row, col, step_cost) for row, (col, step_cost) in enumerate(path)]
+
+def ucs_steps(goal, n=8, log=None):
+    """UCS trên bảng node: mỗi node chỉ lưu node cha, cột, chi phí bước và mã state.
+
+    Hàng đợi ưu tiên giữ (chi phí, id node); id tăng dần nên cũng là khoá phụ khi
+    bằng chi phí. Đường đi chỉ được dựng lại khi tới goal, các bước trung gian
+    yield path = None.
+    """
+    parents = array("l", [-1])
+    cols = array("l", [-1])
+    step_costs = array("l", [0])
+    codes = [0]
+    pq = [(0, 0)]
     visited = set()
+    goal_code = encode_state(goal, n)
     step = 0
 
     while pq:
-        cost, state, path = heapq.heappop(pq)
-        state_tuple = tuple(state)
-        if state_tuple in visited:
+        cost, node = heapq.heappop(pq)
+        code = codes[node]
+        if code in visited:
             continue
-        visited.add(state_tuple)
+        visited.add(code)
 
+        state = decode_state(code, n)
         row = len(state)
         step += 1
-        if log_list is not None:
-            log_list.append({
-                "Step": step,
-                "Row": row,
-                "Cost": cost,
-                "State": state.copy(),
-                "Status": "Đang xét"
-            })
+        if log is not None:
+            log.record(step, row, state, EXAMINE, cost=cost)
 
         if row == n:
-            if state_tuple == goal:
-                if log_list is not None:
-                    log_list.append({
-                        "Step": step,
-                        "Row": row,
-                        "Cost": cost,
-                        "State": state.copy(),
-                        "Status": "Hoàn thành (Goal)"
-                    })
-                yield state, True, path
+            if code == goal_code:
+                if log is not None:
+                    log.record(step, row, state, GOAL, cost=cost)
+                yield state, True, build_path(node, parents, cols, step_costs)
                 return
             continue
 
-        for col in range(n):
-            if is_safe(state, row, col):
-                step_cost = calc_attack_cost(row, col, path)
-                new_cost = cost + step_cost
-                new_state = state + [col]
-                new_path = path + [(row, col, step_cost)]
-
-                if log_list is not None:
-                    log_list.append({
-                        "Step": step,
-                        "Row": row,
-                        "Cost": new_cost,
-                        "State": new_state.copy(),
-                        "Status": f"Thử cột {col} (chi phí {step_cost})"
-                    })
-
-                yield new_state, False, new_path
-                heapq.heappush(pq, (new_cost, new_state, new_path))
-
-class BoardCanvas:
-    def __init__(self, parent, n=8, cell_size=40):
-        self.n = n
-        self.cell = cell_size
-        self.canvas = tk.Canvas(parent, width=n*cell_size, height=n*cell_size)
-        self.canvas.pack()
-        self.queen_items = []
-        self._draw_grid()
-
-    def _draw_grid(self):
-        self.canvas.delete("cell")
-        for r in range(self.n):
-            for c in range(self.n):
-                x1, y1 = c*self.cell, r*self.cell
-                x2, y2 = x1+self.cell, y1+self.cell
-                color = "white" if (r+c)%2==0 else "gray"
-                self.canvas.create_rectangle(x1,y1,x2,y2, fill=color, tags="cell")
-
-    def clear_queens(self):
-        for item in self.queen_items:
-            self.canvas.delete(item)
-        self.queen_items = []
-
-    def show_partial(self, state, color="red"):
-        self.clear_queens()
-        for r, c in enumerate(state):
-            cx = c*self.cell + self.cell/2
-            cy = r*self.cell + self.cell/2
-            tid = self.canvas.create_text(cx, cy, text="Q", font=("Arial", 16, "bold"), fill=color)
-            self.queen_items.append(tid)
-
-    def flash_scene(self, color):
-        overlay = self.canvas.create_rectangle(
-            0, 0, self.n*self.cell, self.n*self.cell,
-            fill=color, outline="")
-        self.canvas.after(500, lambda: self.canvas.delete(overlay))
+        masks = state_masks(state, n)
+        for col, _ in expand(masks, n):
+            step_cost = calc_attack_cost(masks[0], col)
+            new_cost = cost + step_cost
+            new_state = state + [col]
+
+            if log is not None:
+                log.record(step, row, new_state, TRY_COLUMN_COST, cost=new_cost, arg=step_cost)
+
+            yield new_state, False, None
+            parents.append(node)
+            cols.append(col)
+            step_costs.append(step_cost)
+            codes.append(push_col(code, row, col, n))
+            heapq.heappush(pq, (new_cost, len(codes) - 1))
 
 def main():
     root = tk.Tk()
     root.title("N-Queens UCS")
 
-    all_sols = solve_n_queens_all(8)
-    goal_holder = {"sol": None, "gen": None, "log": []}
+    all_sols = load_solutions(8)
+    goal_holder = {"sol": None, "gen": None, "log": StreamingLogSink("ucs_process.csv", step_columns("Step", "Row", "Cost", "State", "Status"))}
 
     def random_goal():
+        controller.stop()
         sol = random.choice(all_sols)
         goal_holder["sol"] = sol
         board_right.show_partial(sol, color="blue")
@@ -141,50 +91,38 @@ def main():
         sol = goal_holder.get("sol")
         if not sol:
             return
+        controller.stop()
         goal_holder["log"].clear()
-        goal_holder["gen"] = ucs_steps(sol, 8, log_list=goal_holder["log"])
-        step()
+        goal_holder["gen"] = ucs_steps(sol, 8, log=goal_holder["log"])
+        controller.start(goal_holder["gen"], on_finish=finish)
 
-    def step():
-        gen = goal_holder.get("gen")
-        if not gen:
-            return
-        try:
-            state, done, path = next(gen)  # UCS có 3 giá trị trả về
-            board_left.show_partial(state, color="red")
-            if done:
-                board_left.flash_scene("lightgreen")
-                return
-            root.after(10, step)
-        except StopIteration:
-            return
+    def finish(item, exhausted):
+        if not exhausted:
+            board_left.flash_scene("lightgreen")
 
     def export_ucs_log():
         log = goal_holder["log"]
         if not log:
             return
-        filename = "ucs_process.csv"
-        with open(filename, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=["Step", "Row", "Cost", "State", "Status"])
-            writer.writeheader()
-            for row in log:
-                writer.writerow(row)
-        popup = tk.Toplevel(root)
-        tk.Label(popup, text=f"Đã lưu quá trình UCS vào {filename}", padx=20, pady=10).pack()
-        tk.Button(popup, text="Đóng", command=popup.destroy).pack(pady=10)
+        log.flush()
+        header, rows = log.recent_rows()
+        show_log_popup(root, f"Đã lưu quá trình UCS vào {log.path}", header, rows)
 
     frame = tk.Frame(root)
     frame.pack()
     board_left = BoardCanvas(frame, n=8, cell_size=40)
     board_right = BoardCanvas(frame, n=8, cell_size=40)
+    controller = RunController(root, board_left, delay=10)
 
     btn_frame = tk.Frame(root)
     btn_frame.pack(pady=10)
     tk.Button(btn_frame, text="Random", command=random_goal).pack(side="left", padx=10)
     tk.Button(btn_frame, text="Run", command=run).pack(side="left", padx=10)
     tk.Button(btn_frame, text="Xuất quá trình", command=export_ucs_log).pack(side="left", padx=10)
+    controller.controls(btn_frame)
 
     root.mainloop()
+    goal_holder["log"].close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
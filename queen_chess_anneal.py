@@ -0,0 +1,169 @@
+# Hàm chi phí dùng chung cho ủ nhiệt và chế độ parallel tempering (replica
+# exchange): nhiều chuỗi chạy ở các nhiệt độ khác nhau trên một pool tiến trình,
+# sau mỗi exchange_interval bước thì thử đổi state giữa hai chuỗi nhiệt độ kề nhau.
+import math
+import os
+import random
+from multiprocessing import Event, Pool
+
+def diagonal_counts(state):
+    """Số hậu trên mỗi đường chéo: down theo r - c + n - 1, up theo r + c"""
+    n = len(state)
+    down = [0] * (2 * n - 1)
+    up = [0] * (2 * n - 1)
+    for r, c in enumerate(state):
+        down[r - c + n - 1] += 1
+        up[r + c] += 1
+    return down, up
+
+def cost(state, goal_state=None):
+    n = len(state)
+    attacks = sum(k * (k - 1) // 2 for counts in diagonal_counts(state) for k in counts)
+
+    if goal_state is None:
+        return attacks
+    else:
+        distance = 0
+        for i in range(n):
+            if state[i] != goal_state[i]:
+                distance += 1
+        return attacks * n + distance
+
+def swap_rows(state, down, up, r1, r2):
+    """Đổi chỗ hậu của hai hàng ngay trên state và các bộ đếm đường chéo trong O(1).
+
+    Trả về độ thay đổi số cặp hậu ăn nhau; gọi lại với cùng r1, r2 để hoàn tác.
+    """
+    n = len(state)
+    c1, c2 = state[r1], state[r2]
+    # Bỏ một hậu khỏi đường chéo có k hậu làm mất k - 1 cặp, thêm vào thì được thêm k cặp
+    down[r1 - c1 + n - 1] -= 1
+    up[r1 + c1] -= 1
+    delta = -(down[r1 - c1 + n - 1] + up[r1 + c1])
+    down[r2 - c2 + n - 1] -= 1
+    up[r2 + c2] -= 1
+    delta -= down[r2 - c2 + n - 1] + up[r2 + c2]
+    delta += down[r1 - c2 + n - 1] + up[r1 + c2]
+    down[r1 - c2 + n - 1] += 1
+    up[r1 + c2] += 1
+    delta += down[r2 - c1 + n - 1] + up[r2 + c1]
+    down[r2 - c1 + n - 1] += 1
+    up[r2 + c1] += 1
+    state[r1], state[r2] = c2, c1
+    return delta
+
+def swap_cost_delta(state, down, up, r1, r2, goal_state=None):
+    """Như swap_rows nhưng trả về độ thay đổi của cost(state, goal_state)"""
+    delta = swap_rows(state, down, up, r1, r2)
+    if goal_state is None:
+        return delta
+    # Sau khi đổi: hàng r1 mang cột cũ của r2 và ngược lại
+    c1, c2 = state[r2], state[r1]
+    distance_delta = ((c2 != goal_state[r1]) + (c1 != goal_state[r2])
+                      - (c1 != goal_state[r1]) - (c2 != goal_state[r2]))
+    return delta * len(state) + distance_delta
+
+_chain = {}
+
+def _init_chain(stop):
+    _chain["stop"] = stop
+
+def _run_chain(args):
+    """Chạy một chuỗi Metropolis ở nhiệt độ cố định T trong tối đa steps bước"""
+    index, state, goal_state, T, steps, seed = args
+    rng = random.Random(seed)
+    stop = _chain["stop"]
+    n = len(state)
+    down, up = diagonal_counts(state)
+    current_cost = cost(state, goal_state)
+    proposed = accepted = 0
+    while proposed < steps and current_cost != 0:
+        # Thỉnh thoảng kiểm tra xem chuỗi khác đã tìm được lời giải chưa
+        if proposed % 1024 == 0 and stop.is_set():
+            break
+        proposed += 1
+        r1 = rng.randrange(n)
+        r2 = rng.randrange(n - 1)
+        if r2 >= r1:
+            r2 += 1
+        delta_E = swap_cost_delta(state, down, up, r1, r2, goal_state)
+        if delta_E < 0 or rng.random() < math.exp(-delta_E / T):
+            current_cost += delta_E
+            accepted += 1
+        else:
+            swap_rows(state, down, up, r1, r2)
+    if current_cost == 0:
+        stop.set()
+    return index, state, current_cost, proposed, accepted
+
+def _update_rates(stats):
+    stats["acceptance_rate"] = [a / p if p else 0.0 for a, p in zip(stats["accepted"], stats["proposed"])]
+    stats["swap_rate"] = [a / t if t else 0.0 for a, t in zip(stats["swaps_accepted"], stats["swaps_attempted"])]
+
+def tempering_steps(goal_state=None, n=8, chains=None, T_min=None, T_max=50.0, exchange_interval=2000,
+                    max_rounds=500, stats=None):
+    """Parallel tempering: chains chuỗi ở các nhiệt độ cấp số nhân từ T_min tới T_max.
+
+    Mỗi vòng, mọi chuỗi chạy exchange_interval bước trên pool tiến trình rồi các
+    cặp chuỗi kề nhau (xen kẽ cặp chẵn / lẻ) đổi state với xác suất
+    min(1, exp((E_i - E_j) * (1/T_i - 1/T_j))). Sau mỗi vòng yield state tốt nhất,
+    path là [(chuỗi, nhiệt độ, chi phí)]; chuỗi nào đạt chi phí 0 thì dừng ngay.
+    stats (dict) nhận số bước đề xuất / chấp nhận và tỉ lệ chấp nhận của từng
+    chuỗi cùng số lần đổi state giữa các cặp chuỗi.
+
+    T_min mặc định là 0.1 khi không có goal: chi phí khi đó chỉ là số cặp ăn nhau,
+    và ở 0.5 chuỗi lạnh nhất vẫn quá nóng để dừng ở 0. Khi có goal thì mặc định là
+    0.5, vì một bước đổi chỗ làm khoảng cách tới goal thay đổi 1 - 2 đơn vị và chuỗi
+    lạnh nhất cần còn đi được qua các bước đó.
+    """
+    if T_min is None:
+        T_min = 0.1 if goal_state is None else 0.5
+    chains = max(2, chains or os.cpu_count() or 1)
+    temperatures = [T_min * (T_max / T_min) ** (i / (chains - 1)) for i in range(chains)]
+    states = [random.sample(range(n), n) for _ in range(chains)]
+    costs = [cost(state, goal_state) for state in states]
+    if stats is None:
+        stats = {}
+    stats.update(temperatures=temperatures, rounds=0, proposed=[0] * chains, accepted=[0] * chains,
+                 swaps_attempted=[0] * (chains - 1), swaps_accepted=[0] * (chains - 1))
+    _update_rates(stats)
+
+    def chain_path():
+        return [(i, temperatures[i], costs[i]) for i in range(chains)]
+
+    for i in range(chains):
+        if costs[i] == 0:
+            yield states[i], True, chain_path()
+            return
+
+    stop = Event()
+    pool = Pool(min(chains, os.cpu_count() or 1), initializer=_init_chain, initargs=(stop,))
+    try:
+        for round_index in range(max_rounds):
+            tasks = [(i, states[i], goal_state, temperatures[i], exchange_interval, random.getrandbits(64))
+                     for i in range(chains)]
+            for i, state, chain_cost, proposed, accepted in pool.imap_unordered(_run_chain, tasks):
+                states[i], costs[i] = state, chain_cost
+                stats["proposed"][i] += proposed
+                stats["accepted"][i] += accepted
+                if chain_cost == 0:
+                    stats["rounds"] = round_index + 1
+                    _update_rates(stats)
+                    yield state, True, chain_path()
+                    return
+            stats["rounds"] = round_index + 1
+
+            for i in range(round_index % 2, chains - 1, 2):
+                stats["swaps_attempted"][i] += 1
+                x = (costs[i] - costs[i + 1]) * (1 / temperatures[i] - 1 / temperatures[i + 1])
+                if x >= 0 or random.random() < math.exp(x):
+                    states[i], states[i + 1] = states[i + 1], states[i]
+                    costs[i], costs[i + 1] = costs[i + 1], costs[i]
+                    stats["swaps_accepted"][i] += 1
+            _update_rates(stats)
+
+            best = min(range(chains), key=costs.__getitem__)
+            yield states[best], False, chain_path()
+    finally:
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,129 @@
+# Local beam search ngẫu nhiên trên hoán vị: giữ beam_width state đầy đủ, mỗi vòng
+# sinh mọi state con (đổi chỗ hậu của hai hàng) và rút ngẫu nhiên beam mới với xác
+# suất exp(-chi phí / T). Beam được chia thành từng phần cho pool tiến trình, mỗi
+# tiến trình tự sinh, chấm điểm và rút mẫu nên chỉ phải gửi về beam_width state.
+import math
+import os
+import random
+import time
+from multiprocessing import Pool
+
+from queen_chess_anneal import cost, diagonal_counts, swap_cost_delta, swap_rows
+from queen_chess_solutions import load_solutions
+
+def _expand_chunk(args):
+    """Sinh và chấm điểm mọi state con của một phần beam, rút k mẫu trong phần đó.
+
+    Trả về (chi phí nhỏ nhất, tổng trọng số tính so với chi phí nhỏ nhất đó,
+    state con tốt nhất, k state con rút theo trọng số).
+    """
+    states, goal, T, k, seed = args
+    rng = random.Random(seed)
+    n = len(states[0])
+    scores, moves = [], []
+    for index, state in enumerate(states):
+        down, up = diagonal_counts(state)
+        base = cost(state, goal)
+        for r1 in range(n - 1):
+            for r2 in range(r1 + 1, n):
+                scores.append(base + swap_cost_delta(state, down, up, r1, r2, goal))
+                swap_rows(state, down, up, r1, r2)
+                moves.append((index, r1, r2))
+
+    low = min(scores)
+    weights = [math.exp((low - score) / T) for score in scores]
+
+    def child(i):
+        index, r1, r2 = moves[i]
+        state = list(states[index])
+        state[r1], state[r2] = state[r2], state[r1]
+        return state
+
+    best = scores.index(low)
+    picks = rng.choices(range(len(scores)), weights=weights, k=k)
+    return low, sum(weights), child(best), [child(i) for i in picks]
+
+def stochastic_beam_steps(goal=None, n=8, beam_width=8, T=1.0, max_iterations=100, workers=None, pool=None):
+    """Stochastic local beam search, cùng giao thức yield với beam_steps.
+
+    Chi phí là cost của ủ nhiệt (số cặp hậu ăn nhau, có goal thì cộng thêm khoảng
+    cách tới goal) nên chỉ đạt 0 ở goal. Beam mới gồm beam_width state rút có hoàn
+    lại từ mọi state con với trọng số exp(-chi phí / T). Beam chia đều cho workers
+    tiến trình (mặc định số lõi, 1 là chạy ngay trong tiến trình này); truyền pool
+    có sẵn để dùng lại giữa nhiều lần chạy. Mỗi vòng yield state con tốt nhất.
+    """
+    workers = workers or os.cpu_count() or 1
+    beam = [random.sample(range(n), n) for _ in range(beam_width)]
+    for state in beam:
+        if cost(state, goal) == 0:
+            yield state, True, [(i, state[i], 0) for i in range(n)]
+            return
+
+    own_pool = pool is None and workers > 1
+    if own_pool:
+        pool = Pool(workers)
+    try:
+        for _ in range(max_iterations):
+            chunks = max(1, min(workers, beam_width))
+            tasks = [(beam[i::chunks], goal, T, beam_width, random.getrandbits(64)) for i in range(chunks)]
+            results = list(pool.map(_expand_chunk, tasks) if workers > 1 else map(_expand_chunk, tasks))
+
+            low = min(result[0] for result in results)
+            best = next(result[2] for result in results if result[0] == low)
+            path = [(i, best[i], low) for i in range(n)]
+            if low == 0:
+                yield best, True, path
+                return
+            yield best, False, path
+
+            # Đưa tổng trọng số của các phần về cùng mốc chi phí nhỏ nhất rồi
+            # chọn phần cho từng chỗ trong beam, lấy lần lượt các mẫu của phần đó
+            totals = [result[1] * math.exp((low - result[0]) / T) for result in results]
+            samples = [iter(result[3]) for result in results]
+            beam = [next(samples[j]) for j in random.choices(range(len(results)), weights=totals, k=beam_width)]
+    finally:
+        if own_pool:
+            pool.terminate()
+            pool.join()
+
+def success_rates(n=8, beam_widths=(1, 2, 4, 8, 16), trials=20, goal=None, workers=None, **kwargs):
+    """Tỉ lệ số lần stochastic_beam_steps tìm được lời giải (hoặc goal) theo từng beam_width"""
+    workers = workers or os.cpu_count() or 1
+    rates = {}
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        for width in beam_widths:
+            successes = 0
+            for _ in range(trials):
+                for _, done, _ in stochastic_beam_steps(goal, n, width, workers=workers, pool=pool, **kwargs):
+                    pass
+                successes += done
+            rates[width] = successes / trials
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return rates
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Xác suất tìm được lời giải của stochastic local beam search")
+    parser.add_argument("-n", type=int, default=8)
+    parser.add_argument("-w", "--widths", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("-T", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--goal", action="store_true", help="chọn ngẫu nhiên một goal thay vì nhận mọi lời giải")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    goal = random.choice(load_solutions(args.n)) if args.goal else None
+    start = time.perf_counter()
+    rates = success_rates(args.n, args.widths, args.trials, goal, workers=args.workers, T=args.T,
+                          max_iterations=args.iterations)
+    for width, rate in rates.items():
+        print(f"beam_width={width}: {rate:.0%} thành công")
+    print(f"n={args.n}, {args.trials} lần mỗi beam_width ({time.perf_counter() - start:.2f}s)")
@@ -0,0 +1,195 @@
+# Chạy thử mọi generator *_steps không cần giao diện Tk: lần lượt chạy hết với
+# từng goal (hoặc một mẫu goal khi n lớn), ghi lại thời gian, số node sinh ra /
+# mở rộng, số lần yield, bộ nhớ đỉnh, tỉ lệ thành công và xuất ra JSON/CSV.
+import csv
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from queen_chess_solutions import load_solutions
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# tên: (file, hàm generator, tham số thêm, vị trí cờ done trong giá trị yield)
+ALGORITHMS = {
+    "bfs": ("8_queen_chess_bfs.py", "bfs_steps", {}, 1),
+    "dfs": ("8_queen_chess_dfs.py", "dfs_steps", {}, 1),
+    "dls": ("8_queen_chess_dls.py", "dls_steps", {}, 1),
+    "ids": ("8_queen_chess_ids.py", "ids_steps", {}, 1),
+    "ids_resume": ("8_queen_chess_ids.py", "ids_steps", {"resume": True}, 1),
+    "ucs": ("8_queen_chess_ucs.py", "ucs_steps", {}, 1),
+    "astar": ("8_queen_chess_A_stars.py", "astar_steps", {}, 1),
+    "astar_best_first": ("8_queen_chess_A_stars.py", "astar_steps", {"best_first": True}, 1),
+    "greedy": ("8_queen_chess_h_n_greedy.py", "greed_steps", {}, 1),
+    "beam": ("8_queen_chess_beam.py", "beam_steps", {}, 1),
+    "beam_stochastic": ("queen_chess_beam.py", "stochastic_beam_steps", {"beam_width": 16}, 1),
+    "backtracking": ("8_queen_chess_backtracking.py", "backtracking_steps", {}, 1),
+    "and_or": ("8_queen_chess_and_or_tree.py", "and_or_search", {}, 2),
+    "and_or_memo": ("8_queen_chess_and_or_tree.py", "and_or_search", {"memo": True}, 2),
+    "genetic": ("8_queen_chess_genetic.py", "genetic_algorithm_steps", {}, 1),
+    "genetic_vectorized": ("8_queen_chess_genetic.py", "genetic_algorithm_steps_vectorized", {}, 1),
+    "genetic_islands": ("queen_chess_ga.py", "island_steps", {"islands": 2}, 1),
+    "hill_climbing": ("8_queen_chess_hill_climbing.py", "hill_climb_steps", {}, 1),
+    "min_conflicts": ("8_queen_chess_min_conflicts.py", "min_conflicts_steps", {}, 1),
+    "simulated_annealing": ("8_queen_chess_simulated_annealing.py", "simulated_annealing_steps", {}, 1),
+    "sa_tempering": ("queen_chess_anneal.py", "tempering_steps", {"chains": 4}, 1),
+}
+
+# Các thuật toán bỏ qua goal: mọi lời giải đều tính là thành công nên success_rate
+# của chúng không so được với các dòng đi tới đúng goal
+GOAL_FREE = {"min_conflicts"}
+
+FIELDS = ["algorithm", "n", "goal", "goal_free", "success", "wall_time", "yields", "generated", "expanded", "peak_memory"]
+
+def load_module(filename):
+    """Nạp file thuật toán như một module (không gọi main nên Tk không khởi động)"""
+    if not filename.startswith("8_queen_chess_"):
+        # Module dùng chung nạp theo tên thật để pool tiến trình tìm được các hàm của nó
+        return importlib.import_module(os.path.splitext(filename)[0])
+    name = "queen_chess_algo_" + os.path.splitext(filename)[0].replace("8_queen_chess_", "")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BASE_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def _counting_expand(expand, counter):
+    def counted(masks, n):
+        counter["expanded"] += 1
+        for item in expand(masks, n):
+            counter["generated"] += 1
+            yield item
+    return counted
+
+def _counting_safe_pairs(safe_pairs, counter):
+    def counted(states, n):
+        pairs = safe_pairs(states, n)
+        counter["expanded"] += len(states)
+        counter["generated"] += len(pairs)
+        return pairs
+    return counted
+
+# Các hàm sinh node được bọc lại để đếm số node mở rộng / sinh ra
+COUNTED = {"expand": _counting_expand, "safe_pairs": _counting_safe_pairs}
+
+def run_once(name, goal, n, max_yields=None, trace_memory=True):
+    filename, func_name, kwargs, done_index = ALGORITHMS[name]
+    module = load_module(filename)
+    counter = {"expanded": 0, "generated": 0}
+    originals = {attr: getattr(module, attr) for attr in COUNTED if hasattr(module, attr)}
+    for attr, original in originals.items():
+        setattr(module, attr, COUNTED[attr](original, counter))
+
+    yields = 0
+    success = False
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        for item in getattr(module, func_name)(goal, n, **kwargs):
+            yields += 1
+            if item[done_index] is True:
+                success = True
+                break
+            if max_yields is not None and yields >= max_yields:
+                break
+    finally:
+        wall_time = time.perf_counter() - start
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        for attr, original in originals.items():
+            setattr(module, attr, original)
+
+    return {
+        "algorithm": name,
+        "n": n,
+        "goal": list(goal),
+        "goal_free": name in GOAL_FREE,
+        "success": success,
+        "wall_time": wall_time,
+        "yields": yields,
+        "generated": counter["generated"] if originals else None,
+        "expanded": counter["expanded"] if originals else None,
+        "peak_memory": peak,
+    }
+
+def select_goals(n, sample=None, seed=0):
+    table = load_solutions(n)
+    if sample is None or sample >= len(table):
+        return list(table)
+    rng = random.Random(seed)
+    return [table[i] for i in sorted(rng.sample(range(len(table)), sample))]
+
+def summarize(runs):
+    summary = {}
+    for run in runs:
+        s = summary.setdefault(run["algorithm"], {"goal_free": run["goal_free"], "runs": 0, "successes": 0,
+                                                  "wall_time": 0.0, "yields": 0, "peak_memory": 0})
+        s["runs"] += 1
+        s["successes"] += run["success"]
+        s["wall_time"] += run["wall_time"]
+        s["yields"] += run["yields"]
+        s["peak_memory"] = max(s["peak_memory"], run["peak_memory"] or 0)
+    for s in summary.values():
+        s["success_rate"] = s["successes"] / s["runs"]
+        s["mean_wall_time"] = s["wall_time"] / s["runs"]
+        s["mean_yields"] = s["yields"] / s["runs"]
+    return summary
+
+def run_benchmark(algorithms=None, n=8, sample=None, seed=0, max_yields=None, trace_memory=True, progress=None):
+    goals = select_goals(n, sample, seed)
+    runs = []
+    for name in algorithms or ALGORITHMS:
+        for i, goal in enumerate(goals):
+            # Cố định seed cho từng lần chạy để các thuật toán ngẫu nhiên lặp lại được
+            random.seed(seed + i)
+            run = run_once(name, goal, n, max_yields, trace_memory)
+            runs.append(run)
+            if progress is not None:
+                progress(run)
+    return runs
+
+def write_json(runs, f):
+    json.dump({"runs": runs, "summary": summarize(runs)}, f, ensure_ascii=False, indent=2)
+
+def write_csv(runs, f):
+    writer = csv.DictWriter(f, fieldnames=FIELDS)
+    writer.writeheader()
+    for run in runs:
+        writer.writerow(dict(run, goal=" ".join(map(str, run["goal"]))))
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark các thuật toán N-Queens không cần giao diện")
+    parser.add_argument("-n", type=int, default=8)
+    parser.add_argument("-a", "--algorithms", nargs="+", choices=list(ALGORITHMS), default=None)
+    parser.add_argument("--sample", type=int, default=None, help="số goal lấy mẫu (mặc định: tất cả)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-yields", type=int, default=None)
+    parser.add_argument("--no-memory", action="store_true", help="tắt tracemalloc để đo thời gian chính xác hơn")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    def report(run):
+        print(f"{run['algorithm']:<20} {run['goal']} {'OK ' if run['success'] else 'FAIL'} "
+              f"{run['wall_time']:.4f}s {run['yields']} yields{' (không cần goal)' if run['goal_free'] else ''}",
+              file=sys.stderr)
+
+    runs = run_benchmark(args.algorithms, args.n, args.sample, args.seed, args.max_yields,
+                         not args.no_memory, report)
+    writer = write_json if args.format == "json" else write_csv
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            writer(runs, f)
+    else:
+        writer(runs, sys.stdout)
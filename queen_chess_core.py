@@ -0,0 +1,104 @@
+# Lõi dùng chung cho các file tìm kiếm: lưu vị trí hậu dưới dạng mặt nạ bit
+# (cột, đường chéo trái, đường chéo phải) để tìm các cột an toàn trong O(1).
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EMPTY_MASKS = (0, 0, 0)
+
+def full_mask(n):
+    return (1 << n) - 1
+
+def place(masks, col, n):
+    """Đặt hậu vào cột col ở hàng hiện tại, trả về mặt nạ của hàng kế tiếp"""
+    cols, left, right = masks
+    bit = 1 << col
+    return cols | bit, ((left | bit) << 1) & full_mask(n), (right | bit) >> 1
+
+def state_masks(state, n):
+    """Tính mặt nạ từ đầu cho một state (danh sách cột theo từng hàng)"""
+    masks = EMPTY_MASKS
+    for col in state:
+        masks = place(masks, col, n)
+    return masks
+
+def safe_mask(masks, n):
+    """Mặt nạ các cột an toàn của hàng kế tiếp"""
+    cols, left, right = masks
+    return ~(cols | left | right) & full_mask(n)
+
+def iter_columns(mask):
+    """Duyệt các cột có bit 1 trong mask theo thứ tự tăng dần"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def safe_columns_masked(masks, n):
+    return list(iter_columns(safe_mask(masks, n)))
+
+def safe_columns(state, n):
+    """Mọi cột an toàn cho hàng kế tiếp của prefix state, theo thứ tự tăng dần"""
+    return safe_columns_masked(state_masks(state, n), n)
+
+def safe_column_matrix(states, n):
+    """Ma trận bool |states| x n: ô [i][col] đúng khi col an toàn cho hàng kế tiếp của states[i].
+
+    Mọi prefix trong states phải cùng độ dài k (một tầng của cây tìm kiếm). Có numpy
+    thì so sánh cả tầng một lần bằng broadcasting (|states| x k x n), không có thì
+    tính từng dòng bằng mặt nạ bit và trả về list các list.
+    """
+    if np is None:
+        return [[bool(safe >> col & 1) for col in range(n)]
+                for safe in (safe_mask(state_masks(state, n), n) for state in states)]
+    if not len(states):
+        return np.zeros((0, n), dtype=bool)
+    queens = np.asarray(states, dtype=np.int64).reshape(len(states), -1)
+    k = queens.shape[1]
+    diff = queens[:, :, None] - np.arange(n)
+    # Hậu ở hàng r ăn ô (k, col) khi cùng cột hoặc |cột lệch| = k - r
+    distance = (k - np.arange(k))[None, :, None]
+    return ~((diff == 0) | (np.abs(diff) == distance)).any(axis=1)
+
+# Tầng nhỏ hơn thế này thì chi phí gọi numpy lớn hơn phần tiết kiệm được
+VECTOR_MIN_STATES = 12
+
+def safe_pairs(states, n):
+    """Các cặp (i, col) an toàn của cả tầng, theo thứ tự i rồi col tăng dần"""
+    if np is None or len(states) < VECTOR_MIN_STATES:
+        return [(i, col) for i, state in enumerate(states) for col in safe_columns(state, n)]
+    rows, cols = np.nonzero(safe_column_matrix(states, n))
+    return list(zip(rows.tolist(), cols.tolist()))
+
+def expand(masks, n):
+    """Sinh (col, mặt nạ con) cho mọi cột an toàn, theo thứ tự cột tăng dần"""
+    for col in iter_columns(safe_mask(masks, n)):
+        yield col, place(masks, col, n)
+
+# Mã hoá state thành một số nguyên cơ số n+1 có n chữ số: hàng r là chữ số thứ r
+# tính từ bên trái, bằng col+1 (0 = chưa đặt). Nhờ căn trái nên so sánh hai mã
+# cho cùng kết quả với so sánh hai list state theo thứ tự từ điển.
+
+@lru_cache(maxsize=None)
+def code_powers(n):
+    return tuple((n + 1) ** (n - 1 - r) for r in range(n))
+
+def encode_state(state, n):
+    powers = code_powers(n)
+    return sum((col + 1) * powers[r] for r, col in enumerate(state))
+
+def push_col(code, row, col, n):
+    """Mã của state sau khi đặt thêm hậu ở (row, col), với row = số hậu đã đặt"""
+    return code + (col + 1) * code_powers(n)[row]
+
+def decode_state(code, n):
+    state = []
+    for power in code_powers(n):
+        digit, code = divmod(code, power)
+        if digit == 0:
+            break
+        state.append(digit - 1)
+    return state
@@ -0,0 +1,94 @@
+# Đếm số lời giải N-Queens cho n lớn: chia 1-2 hàng đầu thành các nhánh con,
+# đếm từng nhánh bằng mặt nạ bit trên nhiều tiến trình và dùng đối xứng gương
+# để chỉ phải duyệt nửa trái của hàng đầu.
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from queen_chess_core import EMPTY_MASKS, full_mask, place, safe_mask, iter_columns
+
+def count_completions(cols, left, right, full):
+    """Đếm số cách đặt nốt các hàng còn lại từ mặt nạ hiện tại"""
+    if cols == full:
+        return 1
+    total = 0
+    avail = ~(cols | left | right) & full
+    while avail:
+        bit = avail & -avail
+        avail ^= bit
+        total += count_completions(cols | bit, ((left | bit) << 1) & full, (right | bit) >> 1, full)
+    return total
+
+def split_tasks(n, split_rows=2):
+    """Chia cây tìm kiếm thành các nhánh (tiền tố, mặt nạ, hệ số nhân đối xứng)"""
+    half = n // 2
+    tasks = []
+    for c0 in range(half):
+        masks = place(EMPTY_MASKS, c0, n)
+        if split_rows == 1:
+            tasks.append(((c0,), masks, 2))
+            continue
+        for c1 in iter_columns(safe_mask(masks, n)):
+            tasks.append(((c0, c1), place(masks, c1, n), 2))
+    if n % 2 == 1:
+        # Hậu hàng đầu ở cột giữa: đối xứng gương chuyển sang hàng thứ hai
+        masks = place(EMPTY_MASKS, half, n)
+        if split_rows == 1 or n == 1:
+            tasks.append(((half,), masks, 1))
+        else:
+            for c1 in iter_columns(safe_mask(masks, n)):
+                if c1 < half:
+                    tasks.append(((half, c1), place(masks, c1, n), 2))
+    return tasks
+
+def _count_task(args):
+    n, prefix, masks, weight = args
+    return os.getpid(), prefix, weight * count_completions(*masks, full_mask(n))
+
+def print_progress(worker_stats, done, total):
+    parts = ", ".join(f"{pid}: {tasks} nhánh" for pid, (tasks, _) in sorted(worker_stats.items()))
+    print(f"[{done}/{total}] {parts}", file=sys.stderr)
+
+def count_solutions(n=8, workers=None, split_rows=2, progress=None):
+    """Đếm số lời giải bằng một pool tiến trình, không tạo danh sách lời giải.
+
+    progress(worker_stats, done, total) được gọi sau mỗi nhánh hoàn thành, với
+    worker_stats = {pid: (số nhánh đã xong, số lời giải đã đếm)}.
+    """
+    if n < 1:
+        return 0
+    tasks = [(n, prefix, masks, weight) for prefix, masks, weight in split_tasks(n, split_rows)]
+    workers = workers or os.cpu_count() or 1
+    worker_stats = {}
+    total = 0
+
+    def collect(results):
+        nonlocal total
+        for done, (pid, _, count) in enumerate(results, 1):
+            total += count
+            tasks_done, solutions = worker_stats.get(pid, (0, 0))
+            worker_stats[pid] = (tasks_done + 1, solutions + count)
+            if progress is not None:
+                progress(worker_stats, done, len(tasks))
+
+    if workers == 1:
+        collect(map(_count_task, tasks))
+    else:
+        with Pool(workers) as pool:
+            collect(pool.imap_unordered(_count_task, tasks))
+    return total
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Đếm số lời giải N-Queens trên nhiều lõi")
+    parser.add_argument("n", type=int)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--split-rows", type=int, choices=(1, 2), default=2)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = count_solutions(args.n, args.workers, args.split_rows, None if args.quiet else print_progress)
+    print(f"n={args.n}: {result} lời giải ({time.perf_counter() - start:.2f}s)")
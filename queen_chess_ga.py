@@ -0,0 +1,152 @@
+# Các toán tử di truyền dùng chung và mô hình đảo (island model): nhiều quần thể
+# tiến hoá song song trên một pool tiến trình, cứ mỗi migration_interval thế hệ
+# thì gửi các cá thể tốt nhất sang đảo kế tiếp qua một mảng bộ nhớ chia sẻ.
+import os
+import random
+from collections import Counter
+from multiprocessing import Array, Event, Pool, Queue
+from queue import Empty
+
+def distance_to_goal_fitness(state, goal_state):
+    if len(state) != len(goal_state):
+        raise ValueError("State và Goal State phải có cùng kích thước.")
+    total_distance = sum(abs(state[i] - goal_state[i]) for i in range(len(state)))
+    return total_distance
+
+def conflict_fitness(state, goal_state=None):
+    """Số cặp hậu ăn nhau (cùng cột hoặc cùng đường chéo), bằng 0 khi là một lời giải"""
+    total = 0
+    for counts in (Counter(state),
+                   Counter(c - r for r, c in enumerate(state)),
+                   Counter(c + r for r, c in enumerate(state))):
+        total += sum(k * (k - 1) // 2 for k in counts.values())
+    return total
+
+FITNESS = {
+    "goal": distance_to_goal_fitness,
+    "conflicts": conflict_fitness,
+}
+
+def selection(population_with_fitness, k=3):
+    tournament_contenders = random.sample(population_with_fitness, k)
+    winner = min(tournament_contenders, key=lambda item: item[1])
+    return winner[0]
+
+def crossover(parent1, parent2):
+    n = len(parent1)
+    crossover_point = random.randint(1, n - 1)
+    return parent1[:crossover_point] + parent2[crossover_point:]
+
+def mutate(individual, mutation_rate=0.1):
+    if random.random() < mutation_rate:
+        n = len(individual)
+        mutation_row = random.randint(0, n - 1)
+        individual[mutation_row] = random.randint(0, n - 1)
+    return individual
+
+# Ô trống trong mảng di cư (chưa đảo nào ghi vào)
+EMPTY_SLOT = 0xFFFF
+
+_island = {}
+
+def _init_island(board, queue, stop):
+    _island.update(board=board, queue=queue, stop=stop)
+
+def _migrate(scored, island, islands, migrants, n, fitness, goal):
+    """Ghi các cá thể tốt nhất vào ô của đảo này, nhận cá thể từ đảo trước thay cho các cá thể kém nhất"""
+    board = _island["board"]
+    size = migrants * n
+    outgoing = [col for ind, _ in scored[:migrants] for col in ind]
+    source = (island - 1) % islands * size
+    with board.get_lock():
+        board[island * size:(island + 1) * size] = outgoing
+        incoming = board[source:source + size]
+    if incoming[0] == EMPTY_SLOT:
+        return scored
+    arrivals = [incoming[i:i + n] for i in range(0, size, n)]
+    scored = scored[:-migrants] + [(ind, fitness(ind, goal)) for ind in arrivals]
+    scored.sort(key=lambda item: item[1])
+    return scored
+
+def _run_island(args):
+    (island, islands, goal, n, population_size, max_generations, mutation_rate,
+     migration_interval, migrants, fitness_name, seed) = args
+    random.seed(seed)
+    fitness = FITNESS[fitness_name]
+    queue, stop = _island["queue"], _island["stop"]
+
+    population = [[random.randrange(n) for _ in range(n)] for _ in range(population_size)]
+    best_fitness = None
+    generation = 0
+    for generation in range(1, max_generations + 1):
+        if stop.is_set():
+            break
+        scored = sorted(((ind, fitness(ind, goal)) for ind in population), key=lambda item: item[1])
+        if islands > 1 and generation % migration_interval == 0:
+            scored = _migrate(scored, island, islands, migrants, n, fitness, goal)
+        if best_fitness is None or scored[0][1] < best_fitness:
+            best_fitness = scored[0][1]
+            queue.put(("best", island, generation, best_fitness, scored[0][0]))
+            if best_fitness == 0:
+                stop.set()
+                break
+
+        new_population = [scored[0][0], scored[1][0]]
+        while len(new_population) < population_size:
+            child = crossover(selection(scored), selection(scored))
+            new_population.append(mutate(child, mutation_rate))
+        population = new_population
+    queue.put(("done", island, generation, best_fitness, None))
+
+def island_steps(goal, n=8, islands=None, population_size=100, max_generations=1000, mutation_rate=0.1,
+                 migration_interval=10, migrants=2, fitness="goal"):
+    """GA mô hình đảo trên pool tiến trình, cùng giao thức yield với genetic_algorithm_steps.
+
+    Mỗi đảo là một quần thể riêng dùng selection / crossover / mutate như bản
+    thường. Generator gộp kết quả từ các đảo và chỉ yield khi cá thể tốt nhất
+    toàn cục được cải thiện; đảo nào đạt fitness 0 thì mọi đảo cùng dừng.
+    fitness="conflicts" dùng số cặp hậu ăn nhau thay cho khoảng cách tới goal
+    (khi đó goal có thể là None), phù hợp với n lớn.
+    """
+    islands = islands or os.cpu_count() or 1
+    migrants = max(1, min(migrants, population_size - 2))
+    board = Array("H", [EMPTY_SLOT] * (islands * migrants * n))
+    queue = Queue()
+    stop = Event()
+    base_seed = random.getrandbits(32)
+    tasks = [(i, islands, goal, n, population_size, max_generations, mutation_rate,
+              migration_interval, migrants, fitness, base_seed + i) for i in range(islands)]
+
+    # Số tiến trình bằng số đảo để các đảo chạy đồng thời và trao đổi được với nhau
+    pool = Pool(islands, initializer=_init_island, initargs=(board, queue, stop))
+    try:
+        result = pool.map_async(_run_island, tasks, chunksize=1)
+        best_state, best_fitness, best_generation = None, None, 0
+        finished = 0
+        while finished < islands:
+            try:
+                kind, _, generation, fit, state = queue.get(timeout=0.1)
+            except Empty:
+                if result.ready():
+                    # Ném lại lỗi của tiến trình con nếu có
+                    result.get()
+                continue
+            if kind == "done":
+                finished += 1
+                best_generation = max(best_generation, generation)
+                continue
+            if best_fitness is not None and fit >= best_fitness:
+                continue
+            best_state, best_fitness, best_generation = state, fit, generation
+            path = [(i, state[i], fit, generation) for i in range(n)]
+            if fit == 0:
+                yield state, True, path
+                return
+            yield state, False, path
+
+        if best_state is not None:
+            yield best_state, False, [(i, best_state[i], best_fitness, best_generation) for i in range(n)]
+    finally:
+        stop.set()
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,156 @@
+# Lưu vết quá trình tìm kiếm ở dạng gọn: mỗi bản ghi chỉ gồm vài số nguyên (bước,
+# hàng, chi phí, mã trạng thái, tham số) và state; chuỗi hiển thị chỉ được tạo khi
+# ghi ra file. Có hai nơi nhận bản ghi với cùng hàm record():
+# - TraceLog: giữ toàn bộ vết trong các mảng kiểu cố định (array), state nén thành
+#   các hàng byte độ rộng n.
+# - StreamingLogSink: ghi dần ra file CSV theo từng lô, chỉ giữ một vòng đệm nhỏ
+#   các bản ghi gần nhất để hiện trong cửa sổ xuất log.
+import csv
+import threading
+from array import array
+from collections import deque, namedtuple
+from itertools import repeat
+
+TraceRecord = namedtuple("TraceRecord", "step row cost code arg state")
+
+# Mã trạng thái dùng chung cho log của BFS / DFS / UCS
+EXAMINE, GOAL, TRY_COLUMN, TRY_COLUMN_COST = range(4)
+STATUS_TEXT = ["Đang xét", "Hoàn thành (Goal)", "Thử cột {col}", "Thử cột {col} (chi phí {arg})"]
+
+def status_text(record):
+    col = record.state[-1] if record.state else None
+    return STATUS_TEXT[record.code].format(col=col, arg=record.arg)
+
+STEP_COLUMNS = {
+    "Step": lambda r: r.step,
+    "Row": lambda r: r.row,
+    "Cost": lambda r: r.cost,
+    "State": lambda r: list(r.state),
+    "Status": status_text,
+}
+
+def step_columns(*names):
+    """Danh sách cột (tiêu đề, hàm lấy giá trị) theo tên trong STEP_COLUMNS"""
+    return [(name, STEP_COLUMNS[name]) for name in names]
+
+def write_records(f, columns, records):
+    writer = csv.writer(f)
+    for record in records:
+        writer.writerow([get(record) for _, get in columns])
+
+class TraceLog:
+    """Vết tìm kiếm lưu theo cột: mỗi bản ghi tốn khoảng 20 + n byte"""
+
+    def __init__(self, n, columns):
+        self.n = n
+        self.columns = columns
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.steps = array("L")
+            self.rows = array("h")
+            self.costs = array("l")
+            self.codes = array("B")
+            self.args = array("l")
+            self.lengths = array("H")
+            self.states = array("B" if self.n <= 256 else "H")
+
+    def record(self, step, row, state, code=0, cost=0, arg=0):
+        with self._lock:
+            self.steps.append(step)
+            self.rows.append(row)
+            self.costs.append(cost)
+            self.codes.append(code)
+            self.args.append(arg)
+            self.lengths.append(len(state))
+            self.states.extend(state)
+            self.states.extend(repeat(0, self.n - len(state)))
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, i):
+        start = i * self.n
+        state = tuple(self.states[start:start + self.lengths[i]])
+        return TraceRecord(self.steps[i], self.rows[i], self.costs[i], self.codes[i], self.args[i], state)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in (self.steps, self.rows, self.costs, self.codes,
+                                                 self.args, self.lengths, self.states))
+
+    def export_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow([name for name, _ in self.columns])
+            write_records(f, self.columns, self)
+
+class StreamingLogSink:
+    """Nhận bản ghi bằng record() như TraceLog nhưng ghi dần ra file.
+
+    Bản ghi được gom thành lô batch_size dòng rồi ghi nối vào file CSV; chỉ
+    ring_size bản ghi gần nhất được giữ lại trong recent để giao diện hiển thị.
+    """
+
+    def __init__(self, path, columns, batch_size=1000, ring_size=1000):
+        self.path = path
+        self.columns = columns
+        self.batch_size = batch_size
+        self.recent = deque(maxlen=ring_size)
+        self.count = 0
+        self._batch = []
+        self._file = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.count
+
+    def _write_batch(self):
+        if self._file is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            csv.writer(self._file).writerow([name for name, _ in self.columns])
+        write_records(self._file, self.columns, self._batch)
+        self._batch = []
+
+    def record(self, step, row, state, code=0, cost=0, arg=0):
+        rec = TraceRecord(step, row, cost, code, arg, tuple(state))
+        with self._lock:
+            self._batch.append(rec)
+            self.recent.append(rec)
+            self.count += 1
+            if len(self._batch) >= self.batch_size:
+                self._write_batch()
+
+    def recent_rows(self):
+        """Tiêu đề và các dòng (giá trị theo từng cột) của các bản ghi trong recent"""
+        with self._lock:
+            records = list(self.recent)
+        return [name for name, _ in self.columns], [[get(r) for _, get in self.columns] for r in records]
+
+    def flush(self):
+        with self._lock:
+            if self._batch:
+                self._write_batch()
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def clear(self):
+        """Bắt đầu lượt ghi mới: bỏ các bản ghi cũ và ghi đè file từ đầu"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._batch = []
+            self.recent.clear()
+            self.count = 0
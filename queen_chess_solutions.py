@@ -0,0 +1,182 @@
+# Bảng lời giải N-Queens dùng chung: chỉ sinh các lời giải cơ bản, nhân ra bằng
+# 8 phép đối xứng của bàn cờ rồi lưu thành file nhị phân theo từng n.
+import mmap
+import os
+import struct
+import tempfile
+from multiprocessing import Pool
+
+from queen_chess_core import EMPTY_MASKS, full_mask, iter_columns, place, safe_mask
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".nqueens_cache")
+MAGIC = b"NQS1"
+HEADER = struct.Struct("<4sHQ")
+MMAP_THRESHOLD = 1 << 20
+# Từ n này trở lên bảng lời giải được sinh trên nhiều tiến trình
+PARALLEL_MIN_N = 12
+
+def symmetries(sol):
+    """Trả về tập các lời giải thu được từ sol qua 8 phép đối xứng"""
+    n = len(sol)
+    inverse = [0] * n
+    for r, c in enumerate(sol):
+        inverse[c] = r
+    result = set()
+    for base in (tuple(sol), tuple(inverse)):
+        flipped = base[::-1]
+        result.add(base)
+        result.add(tuple(n - 1 - c for c in base))
+        result.add(flipped)
+        result.add(tuple(n - 1 - c for c in flipped))
+    return result
+
+def _branches(n):
+    """Chia việc tìm lời giải cơ bản thành các nhánh (tiền tố 2 hàng, cột được phép theo hàng).
+
+    Với hậu hàng đầu ở cột a, phần tử đầu của 7 phép đối xứng còn lại là cột của
+    hậu hàng cuối và hàng của hậu ở cột đầu / cột cuối (đo từ hai phía), nên chúng
+    đều phải nằm trong [a, n - 1 - a]: các hàng ngoài khoảng đó không được đặt hậu
+    ở hai cột biên, hàng cuối chỉ được đặt trong khoảng đó. Khi a = 0 (hậu ở góc)
+    thì so phần tử thứ hai với phép chuyển vị: hậu của cột 1 phải nằm ở hàng
+    >= state[1].
+    """
+    full = full_mask(n)
+    edges = 1 | (1 << (n - 1))
+    for a in range((n + 1) // 2):
+        allowed = [full] * n
+        if a > 0:
+            for r in range(1, n - 1):
+                if r < a or r > n - 1 - a:
+                    allowed[r] = full & ~edges
+            allowed[n - 1] = ((1 << (n - a)) - 1) & ~((1 << a) - 1)
+        first = place(EMPTY_MASKS, a, n)
+        for c1 in iter_columns(safe_mask(first, n) & allowed[1]):
+            if a == 0:
+                allowed = [full] * n
+                for r in range(2, c1):
+                    allowed[r] = full & ~2
+            yield (a, c1), allowed
+
+def _search_branch(args):
+    """Các lời giải cơ bản trong một nhánh của _branches"""
+    n, prefix, allowed = args
+    full = full_mask(n)
+    state = list(prefix)
+    sols = []
+
+    def backtrack(cols, left, right):
+        row = len(state)
+        if row == n:
+            sol = tuple(state)
+            if sol == min(symmetries(sol)):
+                sols.append(sol)
+            return
+        avail = ~(cols | left | right) & allowed[row]
+        while avail:
+            bit = avail & -avail
+            avail ^= bit
+            state.append(bit.bit_length() - 1)
+            backtrack(cols | bit, ((left | bit) << 1) & full, (right | bit) >> 1)
+            state.pop()
+
+    masks = EMPTY_MASKS
+    for col in prefix:
+        masks = place(masks, col, n)
+    backtrack(*masks)
+    return sols
+
+def fundamental_solutions(n=8, workers=1):
+    """Sinh các lời giải cơ bản (nhỏ nhất theo thứ tự từ điển trong lớp đối xứng).
+
+    Các nhánh của _branches đã loại phần lớn lời giải không phải đại diện, chỉ
+    những lời giải còn sót lại mới phải so với cả 8 đối xứng. workers > 1 (None
+    là số lõi) thì chia các nhánh cho một pool tiến trình như queen_chess_count.
+    """
+    if n <= 1:
+        return [tuple(range(n))]
+    tasks = [(n, prefix, allowed) for prefix, allowed in _branches(n)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = map(_search_branch, tasks)
+        return sorted(sol for sols in results for sol in sols)
+    with Pool(workers) as pool:
+        return sorted(sol for sols in pool.imap_unordered(_search_branch, tasks) for sol in sols)
+
+def cache_path(n, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"n{n}.bin")
+
+def build_solution_file(n, path):
+    """Ghi mọi lời giải vào file: header + mỗi lời giải n byte"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    # Mỗi lần ghi dùng một file tạm riêng để các tiến trình cùng sinh một file cache
+    # không ghi chồng lên nhau; file nào xong thì thay vào path trọn vẹn
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                     delete=False) as f:
+        tmp = f.name
+        try:
+            f.write(HEADER.pack(MAGIC, n, 0))
+            workers = None if n >= PARALLEL_MIN_N else 1
+            for fundamental in fundamental_solutions(n, workers):
+                for sol in sorted(symmetries(fundamental)):
+                    f.write(bytes(sol))
+                    count += 1
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, n, count))
+        except BaseException:
+            f.close()
+            os.remove(tmp)
+            raise
+    os.replace(tmp, path)
+    return count
+
+class SolutionTable:
+    """Dãy lời giải đọc từ file cache, file lớn được ánh xạ bộ nhớ (mmap)"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, self.n, self.count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"File lời giải không hợp lệ: {path}")
+            size = HEADER.size + self.count * self.n
+            if size >= MMAP_THRESHOLD:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                f.seek(0)
+                self._buf = f.read()
+        if len(self._buf) < size:
+            raise ValueError(f"File lời giải bị cắt ngắn: {path}")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("Chỉ số lời giải vượt quá giới hạn")
+        start = HEADER.size + index * self.n
+        return tuple(self._buf[start:start + self.n])
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+def load_solutions(n=8, cache_dir=CACHE_DIR):
+    """Mở bảng lời giải cho n, sinh và lưu file cache nếu chưa có"""
+    path = cache_path(n, cache_dir)
+    if not os.path.exists(path):
+        build_solution_file(n, path)
+    try:
+        return SolutionTable(path)
+    except (ValueError, struct.error):
+        build_solution_file(n, path)
+        return SolutionTable(path)
+
+def solve_n_queens_all(n=8):
+    return sorted(load_solutions(n))
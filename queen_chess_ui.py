@@ -0,0 +1,281 @@
+# Phần giao diện Tk dùng chung cho các file thuật toán.
+import queue
+import threading
+import time
+import tkinter as tk
+
+def show_log_popup(root, message, header=None, rows=()):
+    """Cửa sổ báo đã lưu log, kèm bảng các bản ghi gần nhất (cuộn tới dòng cuối)"""
+    popup = tk.Toplevel(root)
+    tk.Label(popup, text=message, padx=20, pady=10).pack()
+    if rows:
+        body = tk.Frame(popup)
+        body.pack(padx=10)
+        text = tk.Text(body, width=80, height=min(15, len(rows) + 1), wrap="none")
+        scroll = tk.Scrollbar(body, command=text.yview)
+        text.configure(yscrollcommand=scroll.set)
+        text.insert("end", "\t".join(header) + "\n")
+        text.insert("end", "".join("\t".join(map(str, row)) + "\n" for row in rows))
+        text.configure(state="disabled")
+        text.see("end")
+        text.pack(side="left")
+        scroll.pack(side="left", fill="y")
+    tk.Button(popup, text="Đóng", command=popup.destroy).pack(pady=10)
+
+class BoardCanvas:
+    """Bàn cờ vẽ trên Canvas, mỗi hàng giữ sẵn một quân hậu.
+
+    show_partial chỉ so sánh với trạng thái đã vẽ lần trước rồi di chuyển, đổi
+    màu hoặc ẩn các quân hậu bị thay đổi thay vì xoá và tạo lại toàn bộ. Với n
+    lớn, nền bàn cờ được vẽ bằng một ảnh duy nhất thay cho n*n hình chữ nhật.
+    """
+
+    IMAGE_THRESHOLD = 24
+
+    def __init__(self, parent, n=8, cell_size=40):
+        self.n = n
+        self.cell = cell_size
+        self.canvas = tk.Canvas(parent, width=n*cell_size, height=n*cell_size)
+        self.canvas.pack()
+        self.font = ("Arial", max(6, int(cell_size * 0.4)), "bold")
+        self.queen_items = []
+        self._shown = []
+        self._grid_image = None
+        self._draw_grid()
+
+    def _draw_grid(self):
+        self.canvas.delete("cell")
+        if self.n > self.IMAGE_THRESHOLD:
+            self._draw_grid_image()
+            return
+        for r in range(self.n):
+            for c in range(self.n):
+                x1, y1 = c*self.cell, r*self.cell
+                x2, y2 = x1+self.cell, y1+self.cell
+                color = "white" if (r+c)%2==0 else "gray"
+                self.canvas.create_rectangle(x1,y1,x2,y2, fill=color, tags="cell")
+
+    def _draw_grid_image(self):
+        # Ảnh n x n điểm (mỗi điểm một ô) rồi phóng to theo kích thước ô
+        even = " ".join("#ffffff" if c % 2 == 0 else "#808080" for c in range(self.n))
+        odd = " ".join("#808080" if c % 2 == 0 else "#ffffff" for c in range(self.n))
+        small = tk.PhotoImage(master=self.canvas, width=self.n, height=self.n)
+        small.put(" ".join("{" + (even if r % 2 == 0 else odd) + "}" for r in range(self.n)))
+        self._grid_image = small.zoom(self.cell, self.cell)
+        self.canvas.create_image(0, 0, image=self._grid_image, anchor="nw", tags="cell")
+        self.canvas.tag_lower("cell")
+
+    def _center(self, row, col):
+        return col*self.cell + self.cell/2, row*self.cell + self.cell/2
+
+    def clear_queens(self):
+        for r, item in enumerate(self.queen_items):
+            if self._shown[r] is not None:
+                self.canvas.itemconfigure(item, state="hidden")
+                self._shown[r] = None
+
+    def show_partial(self, state, color="red"):
+        for r, c in enumerate(state):
+            if r == len(self.queen_items):
+                cx, cy = self._center(r, c)
+                tid = self.canvas.create_text(cx, cy, text="Q", font=self.font, fill=color)
+                self.queen_items.append(tid)
+                self._shown.append((c, color))
+                continue
+            if self._shown[r] == (c, color):
+                continue
+            item = self.queen_items[r]
+            self.canvas.coords(item, *self._center(r, c))
+            self.canvas.itemconfigure(item, state="normal", fill=color)
+            self._shown[r] = (c, color)
+        for r in range(len(state), len(self.queen_items)):
+            if self._shown[r] is not None:
+                self.canvas.itemconfigure(self.queen_items[r], state="hidden")
+                self._shown[r] = None
+
+    def flash_scene(self, color):
+        overlay = self.canvas.create_rectangle(
+            0, 0, self.n*self.cell, self.n*self.cell,
+            fill=color, outline="")
+        self.canvas.after(500, lambda: self.canvas.delete(overlay))
+
+class RunController:
+    """Chạy generator của thuật toán trên một luồng nền, mỗi bàn cờ một lượt chạy.
+
+    Luồng nền gửi các trạng thái lấy mẫu vào một hàng đợi có giới hạn, còn
+    vòng lặp Tk định kỳ lấy ra và chỉ vẽ trạng thái mới nhất. Tốc độ 0 là chạy
+    từng bước (mỗi bước cách nhau delay ms như cũ), tốc độ càng cao thì mỗi
+    khung hình chạy càng nhiều bước (2**speed), mức cao nhất chạy hết tốc độ và
+    bỏ bớt các trạng thái khi giao diện chưa kịp vẽ. Ngân sách mỗi khung hình
+    được trừ đi thời gian vẽ đo được. Có thể tạm dừng / tiếp tục và huỷ lượt
+    chạy; bấm Run lần nữa sẽ huỷ lượt đang chạy trước khi bắt đầu lượt mới.
+    """
+
+    MAX_SPEED = 10
+    # Thời gian tối đa stop() chờ luồng nền xong bước đang chạy dở (giây)
+    STOP_TIMEOUT = 1.0
+
+    def __init__(self, root, board, delay=10, frame_ms=16, color="red", queue_size=4):
+        self.root = root
+        self.board = board
+        self.delay = delay
+        self.frame_ms = frame_ms
+        self.color = color
+        self.queue_size = queue_size
+        self.speed = 0
+        self.render_cost = 0.0
+        self._resume = threading.Event()
+        self._resume.set()
+        self._run = None
+        self._job = None
+        self._pause_button = None
+
+    def controls(self, parent):
+        """Thêm thanh trượt tốc độ và các nút Tạm dừng / Dừng vào parent"""
+        scale = tk.Scale(parent, from_=0, to=self.MAX_SPEED, orient="horizontal", label="Tốc độ",
+                         showvalue=False, length=120, command=lambda v: setattr(self, "speed", int(v)))
+        scale.set(self.speed)
+        scale.pack(side="left", padx=10)
+        self._pause_button = tk.Button(parent, text="Tạm dừng", command=self.toggle_pause)
+        self._pause_button.pack(side="left", padx=10)
+        tk.Button(parent, text="Dừng", command=self.stop).pack(side="left", padx=10)
+
+    def start(self, gen, on_step=None, on_finish=None):
+        """on_step(item) chạy trên luồng nền, trả về True khi cần dừng;
+        on_finish(item, exhausted) chạy trên luồng giao diện khi kết thúc"""
+        self.stop()
+        self.resume()
+        run = {
+            "gen": gen,
+            "on_step": on_step or (lambda item: item[1] is True),
+            "on_finish": on_finish,
+            "queue": queue.Queue(self.queue_size),
+            "cancel": threading.Event(),
+        }
+        self._run = run
+        run["thread"] = threading.Thread(target=self._work, args=(run,), daemon=True)
+        run["thread"].start()
+        self._job = self.root.after(self.frame_ms, self._poll, run)
+
+    def stop(self):
+        """Huỷ lượt đang chạy và chờ luồng nền dừng hẳn, để bước đang chạy dở không
+        ghi vào log mà lượt kế tiếp vừa xoá"""
+        run = self._run
+        if run is not None:
+            run["cancel"].set()
+            self._run = None
+            if run["thread"] is not threading.current_thread():
+                run["thread"].join(self.STOP_TIMEOUT)
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def running(self):
+        return self._run is not None
+
+    def pause(self):
+        self._resume.clear()
+        if self._pause_button is not None:
+            self._pause_button.configure(text="Tiếp tục")
+
+    def resume(self):
+        self._resume.set()
+        if self._pause_button is not None:
+            self._pause_button.configure(text="Tạm dừng")
+
+    def toggle_pause(self):
+        if self._resume.is_set():
+            self.pause()
+        else:
+            self.resume()
+
+    def _budget(self, speed):
+        if speed <= 0:
+            return 1, None
+        limit = None if speed >= self.MAX_SPEED else 2 ** speed
+        # Chừa chỗ cho phần vẽ, nhưng luôn giữ ít nhất 1/4 khung hình cho việc tìm kiếm
+        budget = max(self.frame_ms / 4000, (self.frame_ms / 1000) - self.render_cost)
+        return limit, time.perf_counter() + budget
+
+    def _post(self, run, message, block=True):
+        while not run["cancel"].is_set():
+            try:
+                run["queue"].put(message, block=block, timeout=0.1 if block else None)
+                return
+            except queue.Full:
+                if not block:
+                    return
+
+    def _work(self, run):
+        gen, on_step, cancel = run["gen"], run["on_step"], run["cancel"]
+        item = None
+        exhausted = False
+        try:
+            while not cancel.is_set():
+                if not self._resume.wait(0.1):
+                    continue
+                speed = self.speed
+                start = time.perf_counter()
+                limit, deadline = self._budget(speed)
+                finished = False
+                count = 0
+                while not cancel.is_set():
+                    try:
+                        item = next(gen)
+                    except StopIteration:
+                        finished = exhausted = True
+                        break
+                    count += 1
+                    if on_step(item):
+                        finished = True
+                        break
+                    if limit is not None and count >= limit:
+                        break
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        break
+                if finished or cancel.is_set():
+                    break
+                if item is not None:
+                    # Mức nhanh nhất không chờ giao diện: hàng đợi đầy thì bỏ trạng thái này
+                    self._post(run, ("step", item, list(item[0])), block=speed < self.MAX_SPEED)
+                # Chờ trên cancel thay cho time.sleep để stop() không phải đợi hết lượt ngủ
+                if speed <= 0:
+                    cancel.wait(self.delay / 1000)
+                elif speed < self.MAX_SPEED:
+                    cancel.wait(max(0.0, self.frame_ms / 1000 - (time.perf_counter() - start)))
+        except Exception as exc:
+            self._post(run, ("error", exc))
+            return
+        if cancel.is_set():
+            gen.close()
+            return
+        self._post(run, ("done", item, list(item[0]) if item is not None else None, exhausted))
+
+    def _poll(self, run):
+        self._job = None
+        if self._run is not run:
+            return
+        latest = None
+        while True:
+            try:
+                message = run["queue"].get_nowait()
+            except queue.Empty:
+                break
+            latest = message
+            if message[0] != "step":
+                break
+
+        if latest is not None and latest[0] == "error":
+            self._run = None
+            raise latest[1]
+        if latest is not None and latest[2] is not None:
+            start = time.perf_counter()
+            self.board.show_partial(latest[2], color=self.color)
+            self.render_cost = 0.8 * self.render_cost + 0.2 * (time.perf_counter() - start)
+        if latest is not None and latest[0] == "done":
+            self._run = None
+            if run["on_finish"] is not None:
+                run["on_finish"](latest[1], latest[3])
+            return
+        interval = max(1, min(self.delay, self.frame_ms), int(self.render_cost * 2000))
+        self._job = self.root.after(interval, self._poll, run)